@@ -3,10 +3,20 @@ import threading
 import re
 import torch
 import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
 from transformers import AutoTokenizer, AutoModelForCausalLM
 from huggingface_hub import login
 from agentic_models.base import BaseLLMEngine
-from main_configs import GEMMA_FUNCTION_MODEL_ID, HUGGINGFACE_TOKEN
+from agentic_models.gemma_batcher import GemmaBatcher
+from agentic_tools.registry import tool_schema
+from main_configs import (
+    GEMMA_BATCH_MAX_SIZE,
+    GEMMA_BATCH_MAX_WAIT_MS,
+    GEMMA_FUNCTION_MODEL_ID,
+    GEMMA_QUANTIZATION,
+    HUGGINGFACE_TOKEN,
+)
 
 # Setup Logging
 logger = logging.getLogger(__name__)
@@ -28,14 +38,41 @@ def ensure_hf_login():
             login(token=token)
             _logged_in = True
 
+@lru_cache(maxsize=8)
+def _build_tool_schemas(tools: Tuple[Any, ...]) -> Tuple[Dict[str, Any], ...]:
+    """
+    Converts tool callables into the JSON schemas used by the chat template.
+    Keyed on the (hashable) tool tuple so schema generation runs once per tool set.
+    """
+    return tuple(tool_schema(t) for t in tools)
+
+
+def get_tool_schemas(tools: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Returns cached JSON schemas for a sequence of tool callables (or schema dicts)."""
+    try:
+        return list(_build_tool_schemas(tuple(tools)))
+    except TypeError:
+        # Unhashable entries (e.g. raw dict schemas) cannot be memoized
+        return [tool_schema(t) for t in tools]
+
+
 class FunctionGemmaEngine(BaseLLMEngine):
-    def __init__(self, model_id: str = GEMMA_FUNCTION_MODEL_ID):
+    GENERATE_KWARGS: Dict[str, Any] = {
+        "max_new_tokens": 512,
+        # Greedy decoding is STRONGLY recommended for function calling accuracy
+        "do_sample": False,
+        # Slightly higher rep penalty to stop 270M from looping
+        "repetition_penalty": 1.05,
+    }
+
+    def __init__(self, model_id: str = GEMMA_FUNCTION_MODEL_ID, quantization: str = GEMMA_QUANTIZATION):
         super().__init__()
         self.model_id = model_id
+        self.quantization = (quantization or "none").lower()
         
         ensure_hf_login()
 
-        logger.info(f"Loading FunctionGemma model: {self.model_id}")
+        logger.info("Loading FunctionGemma model: %s", self.model_id)
         
         # NOTE: For FunctionGemma, AutoTokenizer is sufficient for chat templates. 
         # AutoProcessor is often used for multimodal, but this is text-to-text.
@@ -44,16 +81,124 @@ class FunctionGemmaEngine(BaseLLMEngine):
         # ------------------------------------------------------------------
         # ACCURACY TIP: Do not quantize 270M models to 4-bit/8-bit unless necessary.
         # The model is tiny (~0.6 GB). Precision loss at this scale is severe.
+        # Quantization is therefore opt-in via GEMMA_QUANTIZATION.
         # ------------------------------------------------------------------
-        torch_dtype = torch.bfloat16 if torch.cuda.is_available() else torch.float32
-        
-        self.model = AutoModelForCausalLM.from_pretrained(
+        self.model = self._load_model()
+
+        # Token ids of the invariant (system prompt + tool declarations) prefix,
+        # keyed by (role, content, tools). See `_encode_prompt`.
+        self._prefix_cache: Dict[Tuple[Any, ...], Tuple[str, torch.Tensor]] = {}
+
+        # Concurrent requests share forward passes (disabled when max size is 1)
+        self.batcher = None
+        if GEMMA_BATCH_MAX_SIZE > 1:
+            pad_token_id = self.tokenizer.pad_token_id
+            if pad_token_id is None:
+                pad_token_id = self.tokenizer.eos_token_id
+            self.batcher = GemmaBatcher(
+                self.model,
+                pad_token_id=pad_token_id,
+                generate_kwargs=self.GENERATE_KWARGS,
+                max_batch_size=GEMMA_BATCH_MAX_SIZE,
+                max_wait_ms=GEMMA_BATCH_MAX_WAIT_MS,
+            )
+
+    def _load_model(self):
+        """
+        Loads the model, optionally quantized.
+
+        - "int8" on CUDA: bitsandbytes 8-bit weights
+        - "int8" on CPU:  dynamic int8 quantization of the Linear layers
+        - "int4":         bitsandbytes 4-bit (CUDA only; falls back to full precision)
+
+        Decoding stays greedy (see `generate`), so tool-call output remains
+        deterministic and is still parsed by `extract_tool_calls`.
+        """
+        has_cuda = torch.cuda.is_available()
+        torch_dtype = torch.bfloat16 if has_cuda else torch.float32
+        load_kwargs: Dict[str, Any] = {}
+
+        if self.quantization in ("int8", "int4") and has_cuda:
+            from transformers import BitsAndBytesConfig
+
+            if self.quantization == "int8":
+                load_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+            else:
+                load_kwargs["quantization_config"] = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_compute_dtype=torch.bfloat16,
+                )
+            logger.info("Loading FunctionGemma with bitsandbytes %s weights", self.quantization)
+        elif self.quantization == "int4":
+            logger.warning("GEMMA_QUANTIZATION=int4 requires CUDA. Loading full precision instead.")
+        elif self.quantization not in ("none", "int8"):
+            logger.warning("Unknown GEMMA_QUANTIZATION '%s'. Loading full precision.", self.quantization)
+
+        model = AutoModelForCausalLM.from_pretrained(
             self.model_id,
             device_map="auto",
             torch_dtype=torch_dtype,
-            trust_remote_code=True
+            trust_remote_code=True,
+            **load_kwargs,
         ).eval()
 
+        if self.quantization == "int8" and not has_cuda:
+            logger.info("Applying dynamic int8 quantization to FunctionGemma Linear layers (CPU)")
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+        return model
+
+    def _encode_prompt(self, messages, tools, tool_schemas) -> Dict[str, torch.Tensor]:
+        """
+        Tokenizes the chat prompt, reusing cached token ids for the prefix.
+
+        The leading system turn and the tool declarations are identical for
+        every request, so they are rendered and tokenized once; per request
+        only the conversation suffix is tokenized and appended.
+        """
+        text = self.tokenizer.apply_chat_template(
+            messages,
+            tools=tool_schemas,
+            add_generation_prompt=True,
+            tokenize=False,
+        )
+
+        prefix = None
+        first = messages[0] if messages else None
+        if first and first.get("role") in ("system", "developer"):
+            try:
+                key = (first["role"], first.get("content", ""), tuple(tools) if tools else ())
+                prefix = self._prefix_cache.get(key)
+                if prefix is None:
+                    prefix_text = self.tokenizer.apply_chat_template(
+                        [first],
+                        tools=tool_schemas,
+                        add_generation_prompt=False,
+                        tokenize=False,
+                    )
+                    prefix_ids = self.tokenizer(
+                        prefix_text, add_special_tokens=False, return_tensors="pt"
+                    )["input_ids"]
+                    prefix = (prefix_text, prefix_ids)
+                    self._prefix_cache[key] = prefix
+            except TypeError:
+                # Unhashable tool entries: tokenize the full prompt instead
+                prefix = None
+
+        if prefix and text.startswith(prefix[0]):
+            prefix_text, prefix_ids = prefix
+            suffix_ids = self.tokenizer(
+                text[len(prefix_text):], add_special_tokens=False, return_tensors="pt"
+            )["input_ids"]
+            input_ids = torch.cat([prefix_ids, suffix_ids], dim=1)
+        else:
+            input_ids = self.tokenizer(text, add_special_tokens=False, return_tensors="pt")["input_ids"]
+
+        input_ids = input_ids.to(self.model.device)
+        return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+
     def extract_tool_calls(self, text: str) -> list[dict]:
         """
         Parses FunctionGemma's specific output format:
@@ -77,14 +222,26 @@ class FunctionGemmaEngine(BaseLLMEngine):
             # FunctionGemma uses 'key:value' or 'key:<escape>value<escape>'
             # We split by comma BUT ignore commas inside <escape> tags.
             
-            # This regex finds: key : ( <escape>content<escape> OR simple_value )
-            arg_pattern = r"(\w+)\s*:\s*(?:<escape>(.*?)<escape>|'([^']*)'|\"([^\"]*)\"|([^,{}]+))"
+            # This regex finds: key : ( <escape>content<escape> OR [list] OR simple_value )
+            arg_pattern = (
+                r"(\w+)\s*:\s*(?:<escape>(.*?)<escape>|'([^']*)'|\"([^\"]*)\""
+                r"|\[((?:<escape>.*?<escape>|[^\]])*)\]|([^,{}\[\]]+))"
+            )
             
-            for key, val_escaped, val_single, val_double, val_simple in re.findall(arg_pattern, args_block):
+            for match in re.finditer(arg_pattern, args_block):
+                key, val_list = match.group(1), match.group(5)
+                if val_list is not None:
+                    # e.g. locations:[<escape>Hanoi<escape>,<escape>Da Nang<escape>]
+                    parsed_args[key] = self._parse_list(val_list)
+                    continue
+
+                val_escaped, val_single, val_double, val_simple = (
+                    match.group(i) or "" for i in (2, 3, 4, 6)
+                )
                 # Select the captured group that isn't empty
                 if val_escaped: raw_val = val_escaped
-                elif val_single is not None and val_single != "": raw_val = val_single
-                elif val_double is not None and val_double != "": raw_val = val_double
+                elif val_single: raw_val = val_single
+                elif val_double: raw_val = val_double
                 else: raw_val = val_simple
 
                 parsed_args[key] = self._cast_value(raw_val)
@@ -93,6 +250,17 @@ class FunctionGemmaEngine(BaseLLMEngine):
 
         return calls
 
+    def _parse_list(self, block: str) -> list:
+        """Splits the inside of a `[...]` argument into cast items, keeping commas inside <escape> tags."""
+        item_pattern = r"<escape>(.*?)<escape>|'([^']*)'|\"([^\"]*)\"|([^,]+)"
+        items = []
+        for escaped, single, double, simple in re.findall(item_pattern, block):
+            if escaped or single or double:
+                items.append(self._cast_value(escaped or single or double))
+            elif simple.strip():
+                items.append(self._cast_value(simple))
+        return items
+
     def _cast_value(self, v: str):
         """Helper to cast string values to python types for LEO CDP."""
         v = v.strip()
@@ -136,31 +304,26 @@ class FunctionGemmaEngine(BaseLLMEngine):
                 "content": SYSTEM_TRIGGER
             })
 
+        # Tool callables are converted to JSON schema once and reused across requests
+        tool_schemas = get_tool_schemas(tools) if tools else None
+
         # Apply chat template handles the <start_function_declaration> formatting automatically
-        inputs = self.tokenizer.apply_chat_template(
-            messages,
-            tools=tools,
-            add_generation_prompt=True,
-            return_dict=True,
-            return_tensors="pt"
-        ).to(self.model.device)
+        # (the invariant system + tools prefix is tokenized once and cached)
+        inputs = self._encode_prompt(messages, tools, tool_schemas)
         
-        # Use torch inference mode for efficiency because we don't need gradients
-        with torch.inference_mode():
-            output = self.model.generate(
-                **inputs,
-                max_new_tokens=512,
-                # Greedy decoding is STRONGLY recommended for function calling accuracy
-                do_sample=False, 
-                # Slightly higher rep penalty to stop 270M from looping
-                repetition_penalty=1.05 
-            )
+        if self.batcher is not None:
+            # Blocks until the batch containing this prompt has been generated
+            gen_tokens = self.batcher.submit(inputs["input_ids"])
+        else:
+            # Use torch inference mode for efficiency because we don't need gradients
+            with torch.inference_mode():
+                output = self.model.generate(**inputs, **self.GENERATE_KWARGS)
+            gen_tokens = output[0][inputs["input_ids"].shape[1]:]
 
-        gen_tokens = output[0][inputs["input_ids"].shape[1]:]
         decoded = self.tokenizer.decode(gen_tokens, skip_special_tokens=True)
         
         # Fallback: Log if we expected a tool call but got plain text
         if tools and "<start_function_call>" not in decoded and len(decoded) < 20:
-             logger.warning(f"Engine Warning: Model did not trigger function call. Output: {decoded}")
+             logger.warning("Engine Warning: Model did not trigger function call. Output: %s", decoded)
 
         return decoded
\ No newline at end of file
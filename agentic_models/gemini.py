@@ -3,7 +3,8 @@ import re
 import json
 import hashlib
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Iterator, Optional
 
 import redis
 from google import genai
@@ -16,6 +17,10 @@ logger = logging.getLogger(__name__)
 
 CACHE_TTL = 3600
 
+# Answers returned in place of a model reply when the call fails
+API_ERROR_ANSWER_PREFIX = "Error connecting to AI service:"
+UNEXPECTED_ERROR_ANSWER = "An unexpected error occurred."
+
 # ============================================================
 # NEW: Enhanced System Instruction for Insights & Natural Language
 # ============================================================
@@ -49,8 +54,9 @@ class GeminiEngine:
         self.model_name = model_name
         self.client = genai.Client(api_key=api_key)
         
-        self._last_response = None
-        self._cached_tool_calls: List[Dict] = []
+        # One engine serves concurrent requests from worker threads: the tool
+        # calls of the last `generate` are only visible to the thread that made it.
+        self._local = threading.local()
 
         # Initialize Redis
         self.redis_client = None
@@ -62,7 +68,7 @@ class GeminiEngine:
             else:
                 logger.warning("REDIS_URL is not set. Caching is disabled.")
         except Exception as e:
-            logger.warning(f"Redis connection failed. Caching disabled. Error: {e}")
+            logger.warning("Redis connection failed. Caching disabled. Error: %s", e)
 
     # ============================================================
     # Caching Helpers
@@ -90,7 +96,7 @@ class GeminiEngine:
             if cached_data:
                 return json.loads(cached_data)
         except Exception as e:
-            logger.error(f"Redis read error: {e}")
+            logger.error("Redis read error: %s", e)
         return None
 
     def _save_to_cache(self, key: str, text: str, tool_calls: List[Dict]):
@@ -104,7 +110,7 @@ class GeminiEngine:
             }
             self.redis_client.setex(key, CACHE_TTL, json.dumps(data))
         except Exception as e:
-            logger.error(f"Redis write error: {e}")
+            logger.error("Redis write error: %s", e)
 
     # ============================================================
     # Parsing & Conversion
@@ -189,13 +195,12 @@ class GeminiEngine:
 
         if cached_result:
             logger.info("⚡ Gemini Cache Hit ✅")
-            self._last_response = None 
-            self._cached_tool_calls = cached_result.get("tool_calls", [])
+            self._local.tool_calls = cached_result.get("tool_calls", [])
             return cached_result.get("text", "")
 
         # 2. Prepare Live Call
         print("\n--- ✅ Gemini Generation Call (Live) ---")
-        self._cached_tool_calls = [] 
+        self._local.tool_calls = []
         
         contents, system_instruction = self._convert_messages(messages)
         
@@ -207,7 +212,7 @@ class GeminiEngine:
 
         try:
             # 3. Call API
-            self._last_response = self.client.models.generate_content(
+            response = self.client.models.generate_content(
                 model=self.model_name,
                 contents=contents,
                 config=config,
@@ -217,16 +222,17 @@ class GeminiEngine:
             text_result = ""
             current_tool_calls = []
 
-            if self._last_response.candidates:
+            if response.candidates:
                 # Extract text if it exists (even if there are tool calls)
                 try:
-                    text_result = (self._last_response.text or "").strip()
+                    text_result = (response.text or "").strip()
                 except ValueError:
                     # API raises ValueError if accessing .text on a pure function-call response
                     text_result = "" 
                 
                 # Extract tools
-                current_tool_calls = self._extract_tool_calls_from_response(self._last_response)
+                current_tool_calls = self._extract_tool_calls_from_response(response)
+                self._local.tool_calls = current_tool_calls
 
             # 5. Save to Cache
             # Only cache if we got a valid response (text or tools)
@@ -237,10 +243,76 @@ class GeminiEngine:
 
         except APIError as e:
             logger.error("Gemini API error: %s", e)
-            return f"Error connecting to AI service: {e}"
+            return f"{API_ERROR_ANSWER_PREFIX} {e}"
         except Exception:
             logger.exception("Gemini unexpected failure")
-            return "An unexpected error occurred."
+            return UNEXPECTED_ERROR_ANSWER
+
+    def generate_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Any]] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming variant of `generate`: yields text chunks as Gemini decodes them.
+
+        Cache hits are replayed as a single chunk. The full text and any function
+        calls in the stream are cached once it completes, so a later `generate`
+        call can reuse them.
+        """
+        cache_key = self._generate_cache_key(messages, tools)
+        cached_result = self._get_from_cache(cache_key)
+
+        if cached_result:
+            logger.info("⚡ Gemini Cache Hit ✅")
+            self._local.tool_calls = cached_result.get("tool_calls", [])
+            text = cached_result.get("text", "")
+            if text:
+                yield text
+            return
+
+        print("\n--- ✅ Gemini Streaming Call (Live) ---")
+        self._local.tool_calls = []
+
+        contents, system_instruction = self._convert_messages(messages)
+
+        config = types.GenerateContentConfig(
+            temperature=0.4,
+            tools=tools or None,
+            system_instruction=system_instruction
+        )
+
+        chunks: List[str] = []
+        tool_calls: List[Dict[str, Any]] = []
+        try:
+            stream = self.client.models.generate_content_stream(
+                model=self.model_name,
+                contents=contents,
+                config=config,
+            )
+
+            for chunk in stream:
+                tool_calls.extend(self._extract_tool_calls_from_response(chunk))
+                try:
+                    text = chunk.text or ""
+                except ValueError:
+                    # Function-call-only chunk: no text to forward
+                    text = ""
+                if text:
+                    chunks.append(text)
+                    yield text
+
+            self._local.tool_calls = tool_calls
+            full_text = "".join(chunks).strip()
+            if full_text or tool_calls:
+                self._save_to_cache(cache_key, full_text, tool_calls)
+
+        except APIError as e:
+            logger.error("Gemini API error: %s", e)
+            yield f"{API_ERROR_ANSWER_PREFIX} {e}"
+        except Exception:
+            logger.exception("Gemini unexpected streaming failure")
+            yield UNEXPECTED_ERROR_ANSWER
 
     # ============================================================
     # Tool Extraction
@@ -262,10 +334,5 @@ class GeminiEngine:
         return calls
 
     def extract_tool_calls(self, text: str = "") -> List[Dict[str, Any]]:
-        if self._cached_tool_calls:
-            return self._cached_tool_calls
-            
-        if self._last_response:
-            return self._extract_tool_calls_from_response(self._last_response)
-            
-        return []
\ No newline at end of file
+        """Tool calls from this thread's most recent `generate` / `generate_stream`."""
+        return getattr(self._local, "tool_calls", [])
\ No newline at end of file
@@ -1,15 +1,104 @@
+import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 # Assuming these are your existing wrappers
-from agentic_models.function_gemma import FunctionGemmaEngine
+from agentic_models.function_gemma import FunctionGemmaEngine, get_tool_schemas
 from agentic_models.gemini import GeminiEngine
+from main_configs import INTENT_PREFILTER_ENABLED
 
 # Configure Logging
 logger = logging.getLogger("leo_router")
 logger.setLevel(logging.INFO)
 
+# ============================================================
+# System Prompts (built once at import, shared by every request)
+# ============================================================
+# STRICT FunctionGemma requirement:
+# We do not add the "LEO" persona here. Gemma's only job is to route.
+# The 'developer' role and tool definitions are handled by the FunctionGemmaEngine
+# using the `tools` list provided at runtime.
+# This string acts as the "context" before tool definitions.
+GEMMA_SYSTEM_PROMPT = "You are a model that can do function calling with the following functions."
+
+# GEMINI / SYNTHESIS Prompt
+# This is where the LEO persona lives.
+GEMINI_SYSTEM_PROMPT = (
+    "You are LEO, an expert CDP assistant. "
+    "You have received the results of technical tool executions. "
+    "Your goal is to synthesize these results into a helpful, natural language response "
+    "for the user in their language (Vietnamese/English).\n"
+    "\n"
+    "### GUIDELINES:\n"
+    "1. **Be Helpful:** Explain what action was taken clearly.\n"
+    "2. **Tone:** Professional, concise, and empathetic.\n"
+)
+
+# Message dicts are treated as read-only by both engines, so a single
+# instance can be prepended to every request's history.
+GEMMA_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": GEMMA_SYSTEM_PROMPT}
+GEMINI_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": GEMINI_SYSTEM_PROMPT}
+
+
+# ============================================================
+# Intent Pre-Classifier
+# ============================================================
+# Prompts that contain none of these words (nor any word from a registered
+# tool's name) go straight to Gemini, skipping the FunctionGemma forward pass.
+# Matching is on word prefixes, so "event" also covers "events".
+# The list errs on the side of routing: a false positive only costs one
+# Gemma call, a false negative loses a tool call. Keywords and prompts are
+# both matched accent-free, so "thoi tiet" hits "thời tiết".
+TOOL_INTENT_KEYWORDS = (
+    # date / time
+    "date", "time", "today", "tomorrow", "yesterday", "day", "week", "month", "year",
+    "ngày", "hôm nay", "ngày mai", "hôm qua", "giờ", "tuần", "tháng", "năm",
+    # weather
+    "weather", "temperature", "rain", "forecast", "hot", "cold",
+    "thời tiết", "nhiệt độ", "mưa", "nắng",
+    # marketing events / alerts
+    "event", "campaign", "holiday", "alert", "promo",
+    "sự kiện", "chiến dịch", "lễ", "cảnh báo", "khuyến mãi",
+    # segments / profiles / data
+    "segment", "profile", "customer", "audience", "user", "member", "vip",
+    "sync", "refresh", "import", "analy", "enrich", "list", "show",
+    "create", "update", "delete", "remove",
+    "phân khúc", "khách hàng", "hồ sơ", "đồng bộ", "phân tích", "tạo", "xóa", "cập nhật",
+    # activation channels
+    "send", "email", "mail", "zalo", "facebook", "fb", "push", "notif", "sms", "message", "activate",
+    "gửi", "tin nhắn", "thông báo", "kích hoạt",
+)
+
+
+def fold_accents(text: str) -> str:
+    """Lowercases and strips Vietnamese diacritics ("Thời tiết" -> "thoi tiet")."""
+    text = text.lower().replace("đ", "d")
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def build_tool_intent_pattern(tools: Sequence[Any]) -> "re.Pattern[str]":
+    """
+    Compiles the keyword list plus every word of each tool's name into one regex.
+
+    Keywords are accent-folded: search `fold_accents(prompt)` with the result.
+    """
+    keywords = {fold_accents(k) for k in TOOL_INTENT_KEYWORDS}
+    for tool in tools:
+        name = getattr(tool, "__name__", "")
+        keywords.update(part for part in name.lower().split("_") if len(part) > 2)
+
+    # Longest first so the alternation prefers the most specific keyword
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})", re.IGNORECASE)
+
+
 def build_system_prompt(model_type: str = "gemini") -> str:
     """
     Returns the appropriate system prompt based on the model.
@@ -19,26 +108,9 @@ def build_system_prompt(model_type: str = "gemini") -> str:
     - The specific trigger phrase "You are a model that can do function calling..." is required.
     """
     if model_type == "gemma":
-        # STRICT FunctionGemma requirement:
-        # We do not add the "LEO" persona here. Gemma's only job is to route.
-        # The 'developer' role and tool definitions are handled by the FunctionGemmaEngine 
-        # using the `tools` list provided at runtime.
-        # This string acts as the "context" before tool definitions.
-        return "You are a model that can do function calling with the following functions."
-    
-    else:
-        # GEMINI / SYNTHESIS Prompt
-        # This is where the LEO persona lives.
-        return (
-            "You are LEO, an expert CDP assistant. "
-            "You have received the results of technical tool executions. "
-            "Your goal is to synthesize these results into a helpful, natural language response "
-            "for the user in their language (Vietnamese/English).\n"
-            "\n"
-            "### GUIDELINES:\n"
-            "1. **Be Helpful:** Explain what action was taken clearly.\n"
-            "2. **Tone:** Professional, concise, and empathetic.\n"
-        )
+        return GEMMA_SYSTEM_PROMPT
+    return GEMINI_SYSTEM_PROMPT
+
 
 class AgentRouter:
     """
@@ -55,6 +127,36 @@ class AgentRouter:
         self.gemma = FunctionGemmaEngine()
         self.gemini = GeminiEngine()
 
+        # Default tool set, registered once at startup (see `register_tools`)
+        self.tools: Optional[Tuple[Any, ...]] = None
+        self.tools_map: Dict[str, Any] = {}
+        self.tool_intent_pattern: Optional["re.Pattern[str]"] = None
+
+    def register_tools(self, tools: Sequence[Any], tools_map: Dict[str, Any]) -> None:
+        """
+        Registers the default tool set used when a call omits `tools` / `tools_map`.
+
+        Also warms the schema cache behind `FunctionGemmaEngine.generate`, so the
+        first request does not pay for inspecting tool signatures and docstrings.
+        """
+        self.tools = tuple(tools)
+        self.tools_map = dict(tools_map)
+        get_tool_schemas(self.tools)
+        self.tool_intent_pattern = build_tool_intent_pattern(self.tools)
+        logger.info("Registered %d tools for routing", len(self.tools))
+
+    def _resolve_tools(
+        self,
+        tools: Optional[Sequence[Any]],
+        tools_map: Optional[Dict[str, Any]],
+    ) -> Tuple[Optional[Sequence[Any]], Dict[str, Any]]:
+        """Falls back to the registered tool set for any argument not supplied."""
+        if tools is None:
+            tools = self.tools
+        if tools_map is None:
+            tools_map = self.tools_map
+        return tools, tools_map or {}
+
     def handle_tool_calling(
         self,
         tool_calling_json: Dict[str, Any],
@@ -67,46 +169,31 @@ class AgentRouter:
 
         Args:
             tool_calling_json: Dict like {"tool_name": "...", "args": {...}}
-            tools: List of tool definitions (optional, for compatibility)
-            tools_map: Mapping of tool names to functions
+            tools: List of tool definitions (defaults to the registered tools)
+            tools_map: Mapping of tool names to functions (defaults to the registered map)
 
         Returns:
             Dict matching the standard response format: {'answer': ..., 'debug': ...}
         """
-        tools_map = tools_map or {}
+        tools, tools_map = self._resolve_tools(tools, tools_map)
         
         tool_name = tool_calling_json.get("tool_name")
         args = tool_calling_json.get("args", {})
         
-        logger.info(f"🔧 Direct tool execution requested: {tool_name}")
+        logger.info("🔧 Direct tool execution requested: %s", tool_name)
         
         debug_calls = [{"name": tool_name, "arguments": args}]
-        debug_results = []
-        result_content = ""
 
         # 1. Execute the Tool
-        if tool_name not in tools_map:
-            error_msg = f"Tool '{tool_name}' not registered in tools_map."
-            logger.error(error_msg)
-            result_content = json.dumps({"error": error_msg})
-        else:
-            try:
-                print(f"  [>] Calling: {tool_name}")
-                func_result = tools_map[tool_name](**args)
-                print(f"  [✓] Success.")
-                result_content = json.dumps(func_result, default=str)
-            except Exception as exc:
-                print(f"  [!] Exception: {exc}")
-                result_content = json.dumps({"error": str(exc)})
-
-        debug_results.append({"name": tool_name, "response": result_content})
+        result_content = self._execute_tool_call(tool_name, args, tools_map)
+        debug_results = [{"name": tool_name, "response": result_content}]
 
         # 2. Synthesize Result via Gemini
         # We construct a synthetic history so Gemini understands what happened.
         # System -> User (Synthetic Context) -> Tool Output
         
         synthesis_messages = [
-            {"role": "system", "content": build_system_prompt("gemini")},
+            GEMINI_SYSTEM_MESSAGE,
             {
                 "role": "user", 
                 "content": f"Execute the tool '{tool_name}' with arguments {args} and report the result."
@@ -130,15 +217,37 @@ class AgentRouter:
             "debug": {"calls": debug_calls, "data": debug_results},
         }
 
-    def handle_message(
-        self, 
-        messages: List[Dict[str, Any]], 
-        tools: Optional[List[Any]] = None, 
-        tools_map: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        
-        tools_map = tools_map or {}
-        
+    # ============================================================
+    # Pipeline Stages
+    # ============================================================
+    def _may_need_tools(self, messages: List[Dict[str, Any]], tools: Optional[Sequence[Any]]) -> bool:
+        """
+        Cheap lexical check run before FunctionGemma.
+
+        Only applies to the registered tool set (the pattern is derived from
+        it); any user turn mentioning a tool keyword keeps the Gemma call.
+        """
+        if not INTENT_PREFILTER_ENABLED or self.tool_intent_pattern is None or tools is not self.tools:
+            return True
+
+        search = self.tool_intent_pattern.search
+        return any(
+            search(fold_accents(m["content"]))
+            for m in messages
+            if m.get("role") == "user" and isinstance(m.get("content"), str)
+        )
+
+    def _detect_intent(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Any]] = None,
+    ) -> Tuple[str, List[Dict[str, Any]], str]:
+        """
+        Runs FunctionGemma over the conversation to pick tool calls.
+
+        Returns:
+            (raw_output, tool_calls, thought_text)
+        """
         # --- STEP 1: PREPARE FOR ROUTING (FunctionGemma) ---
         # FunctionGemma is sensitive. We ensure the prompt is pure.
         # We strip previous system messages if they don't match the tool-calling requirement.
@@ -146,18 +255,20 @@ class AgentRouter:
         
         # Add the specific Developer trigger expected by FunctionGemma
         # Note: Your FunctionGemmaEngine likely handles the actual <start_of_turn>developer wrapping
-        router_messages.insert(0, {
-            "role": "system", # or "developer" depending on your engine's template mapping
-            "content": build_system_prompt("gemma")
-        })
+        # (role "system" or "developer" depending on your engine's template mapping)
+        router_messages.insert(0, GEMMA_SYSTEM_MESSAGE)
 
         # --- STEP 2: INTENT DETECTION ---
+        if not self._may_need_tools(messages, tools):
+            logger.info("⏭️ No tool keyword in prompt. Skipping FunctionGemma routing.")
+            return "", [], ""
+
         logger.info("🤖 Routing via FunctionGemma...")
         # raw_output will contain: <start_function_call>call:func{arg:<escape>val<escape>}...
         raw_output = self.gemma.generate(router_messages, tools)
         
         # Debug logging
-        logger.debug(f"Raw Model Output: {raw_output}")
+        logger.debug("Raw Model Output: %s", raw_output)
 
         # Extract tool calls (Engine must handle <escape> parsing!)
         tool_calls = self.gemma.extract_tool_calls(raw_output) or []
@@ -173,29 +284,61 @@ class AgentRouter:
         if thought_text:
             print(f"Agent Thought: {thought_text}")
 
-        # --- STEP 3: EXECUTION OR DIRECT REPLY ---
-        debug_calls = []
-        debug_results = []
-        
-        # CASE A: No tools triggered -> Hand off to Gemini for conversation
-        if not tool_calls:
-            print("ℹ️ No tool calls detected. Switching to Gemini for chat.")
-            
-            # Re-build messages with the LEO Persona for Gemini
-            chat_messages = [
-                {"role": "system", "content": build_system_prompt("gemini")}
-            ] + [m for m in messages if m["role"] != "system"]
+        return raw_output, tool_calls, thought_text
+
+    @staticmethod
+    def _build_chat_messages(messages: List[Dict[str, Any]], thought_text: str = "") -> List[Dict[str, Any]]:
+        """Re-builds the conversation with the LEO Persona for a tool-free Gemini turn."""
+        chat_messages = [GEMINI_SYSTEM_MESSAGE] + [m for m in messages if m["role"] != "system"]
+
+        # If Gemma had a thought, pass it as context
+        if thought_text:
+            chat_messages.append({"role": "assistant", "content": thought_text})
+
+        return chat_messages
+
+    def _chat_without_tools(self, messages: List[Dict[str, Any]], thought_text: str = "") -> Dict[str, Any]:
+        """CASE A: No tools triggered -> Hand off to Gemini for conversation."""
+        print("ℹ️ No tool calls detected. Switching to Gemini for chat.")
+
+        chat_messages = self._build_chat_messages(messages, thought_text)
+        answer = self.gemini.generate(chat_messages)
+        return {"answer": answer, "debug": {"calls": [], "data": []}}
+
+    @staticmethod
+    def _execute_tool_call(name: str, args: Dict[str, Any], tools_map: Dict[str, Any]) -> str:
+        """Executes a single tool and returns its JSON-encoded result (or error)."""
+        print(f"  [>] Calling: {name}")
+
+        if name not in tools_map:
+            error_msg = f"Tool '{name}' not registered in tools_map."
+            print(f"  [X] Error: {error_msg}")
+            return json.dumps({"error": error_msg})
+
+        try:
+            # Execute python function
+            func_result = tools_map[name](**args)
+            print(f"  [✓] Success.")
             
-            # If Gemma had a thought, pass it as context
-            if thought_text:
-                chat_messages.append({"role": "assistant", "content": thought_text})
-                
-            answer = self.gemini.generate(chat_messages)
-            return {"answer": answer, "debug": {"calls": [], "data": []}}
-
-        # CASE B: Execute Tools
-        print(f"\n🛠️  TRIGGERED {len(tool_calls)} TOOL(S):")
-        
+            # Convert to JSON string
+            return json.dumps(func_result, default=str)
+        except Exception as exc:
+            print(f"  [!] Exception: {exc}")
+            return json.dumps({"error": str(exc)})
+
+    @staticmethod
+    def _build_synthesis_messages(
+        messages: List[Dict[str, Any]],
+        raw_output: str,
+        tool_calls: List[Dict[str, Any]],
+        results: List[str],
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Records tool turns in the history and builds the Gemini synthesis prompt.
+
+        Returns:
+            (final_messages, debug)
+        """
         # According to doc: Turn 3 is the Model outputting the call
         # We add this to history so Gemini knows what happened
         messages.append({
@@ -203,58 +346,75 @@ class AgentRouter:
             "content": raw_output # Contains the <start_function_call> tokens
         })
 
-        tool_outputs_for_llm = []
+        debug_calls = []
+        debug_results = []
 
-        for call in tool_calls:
+        for call, result_content in zip(tool_calls, results):
             name = call["name"]
-            args = call.get("arguments", {})
-            
-            print(f"  [>] Calling: {name}")
-            debug_calls.append({"name": name, "arguments": args})
-
-            result_content = ""
-            
-            if name not in tools_map:
-                error_msg = f"Tool '{name}' not registered in tools_map."
-                print(f"  [X] Error: {error_msg}")
-                result_content = json.dumps({"error": error_msg})
-            else:
-                try:
-                    # Execute python function
-                    func_result = tools_map[name](**args)
-                    print(f"  [✓] Success.")
-                    
-                    # Convert to JSON string
-                    result_content = json.dumps(func_result, default=str)
-                except Exception as exc:
-                    print(f"  [!] Exception: {exc}")
-                    result_content = json.dumps({"error": str(exc)})
-
+            debug_calls.append({"name": name, "arguments": call.get("arguments", {})})
             debug_results.append({"name": name, "response": result_content})
 
             # Format for LLM History (Standard Chat Format)
             # Your GeminiEngine will likely convert this to standard user/model turns
             # or FunctionGemma would convert this to <start_function_response>
-            tool_outputs_for_llm.append({
+            messages.append({
                 "role": "tool",
                 "name": name,
                 "content": result_content
             })
 
-        # Append execution results to history
-        messages.extend(tool_outputs_for_llm)
+        # Replace the FunctionGemma system prompt with the LEO Persona
+        # This ensures the final answer sounds like LEO, not a raw robot.
+        final_messages = [GEMINI_SYSTEM_MESSAGE] + [m for m in messages if m["role"] != "system"]
+
+        return final_messages, {"calls": debug_calls, "data": debug_results}
+
+    def _iter_tool_results(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        tools_map: Dict[str, Any],
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Runs the tool calls concurrently and yields (index, result) as each finishes.
+
+        FunctionGemma emits all calls in one turn with literal arguments, so the
+        calls are independent; a single call runs inline without a pool.
+        """
+        if len(tool_calls) == 1:
+            call = tool_calls[0]
+            yield 0, self._execute_tool_call(call["name"], call.get("arguments", {}), tools_map)
+            return
+
+        with ThreadPoolExecutor(max_workers=len(tool_calls), thread_name_prefix="leo-tool") as pool:
+            futures = {
+                pool.submit(self._execute_tool_call, call["name"], call.get("arguments", {}), tools_map): i
+                for i, call in enumerate(tool_calls)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _execute_tool_calls(self, tool_calls: List[Dict[str, Any]], tools_map: Dict[str, Any]) -> List[str]:
+        """Runs the tool calls concurrently; results keep the order of `tool_calls`."""
+        results: List[str] = [""] * len(tool_calls)
+        for i, result in self._iter_tool_results(tool_calls, tools_map):
+            results[i] = result
+        return results
+
+    def _synthesize(
+        self,
+        messages: List[Dict[str, Any]],
+        raw_output: str,
+        tool_calls: List[Dict[str, Any]],
+        results: List[str],
+        tools: Optional[List[Any]] = None,
+    ) -> Dict[str, Any]:
+        """Records tool turns in the history and asks Gemini for the final answer."""
+        final_messages, debug = self._build_synthesis_messages(messages, raw_output, tool_calls, results)
 
         # --- STEP 4: FINAL SYNTHESIS (Gemini) ---
         # We switch to Gemini here because FunctionGemma is "Single Turn" optimized
         # and we want a rich conversational response.
-        
         print("📝 Synthesizing answer via Gemini...")
-        
-        # Replace the FunctionGemma system prompt with the LEO Persona
-        # This ensures the final answer sounds like LEO, not a raw robot.
-        final_messages = [
-            {"role": "system", "content": build_system_prompt("gemini")}
-        ] + [m for m in messages if m["role"] != "system"]
 
         final_answer = self.gemini.generate(final_messages, tools) or ""
         final_answer = final_answer.strip()
@@ -262,7 +422,111 @@ class AgentRouter:
         if not final_answer:
             final_answer = "Analysis complete. (No summary generated)"
 
-        return {
-            "answer": final_answer,
-            "debug": {"calls": debug_calls, "data": debug_results},
-        }
\ No newline at end of file
+        return {"answer": final_answer, "debug": debug}
+
+    # ============================================================
+    # Entry Points
+    # ============================================================
+    def handle_message(
+        self, 
+        messages: List[Dict[str, Any]], 
+        tools: Optional[List[Any]] = None, 
+        tools_map: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Synchronous pipeline: Gemma routing -> concurrent tool execution -> Gemini synthesis."""
+        tools, tools_map = self._resolve_tools(tools, tools_map)
+
+        raw_output, tool_calls, thought_text = self._detect_intent(messages, tools)
+
+        if not tool_calls:
+            return self._chat_without_tools(messages, thought_text)
+
+        # --- STEP 3: EXECUTE TOOLS ---
+        print(f"\n🛠️  TRIGGERED {len(tool_calls)} TOOL(S):")
+        results = self._execute_tool_calls(tool_calls, tools_map)
+
+        return self._synthesize(messages, raw_output, tool_calls, results, tools)
+
+    async def ahandle_message(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Any]] = None,
+        tools_map: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of `handle_message` for the FastAPI endpoints.
+
+        Model calls run in worker threads, and the tool calls emitted by Gemma
+        are executed concurrently with asyncio.gather. FunctionGemma emits all
+        calls in one turn with literal arguments, so no call can depend on
+        another's output and they form a single independent layer.
+        Latency becomes max(tool_i) instead of sum(tool_i).
+        """
+        tools, tools_map = self._resolve_tools(tools, tools_map)
+
+        raw_output, tool_calls, thought_text = await asyncio.to_thread(
+            self._detect_intent, messages, tools
+        )
+
+        if not tool_calls:
+            return await asyncio.to_thread(self._chat_without_tools, messages, thought_text)
+
+        # --- STEP 3: EXECUTE TOOLS (concurrently) ---
+        print(f"\n🛠️  TRIGGERED {len(tool_calls)} TOOL(S):")
+        results = await asyncio.gather(*[
+            asyncio.to_thread(
+                self._execute_tool_call, call["name"], call.get("arguments", {}), tools_map
+            )
+            for call in tool_calls
+        ])
+
+        return await asyncio.to_thread(
+            self._synthesize, messages, raw_output, tool_calls, list(results), tools
+        )
+
+    def handle_message_streaming(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Any]] = None,
+        tools_map: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming pipeline for /chat/stream.
+
+        Stages are pipelined towards the client: tools run concurrently and a
+        progress event is sent as each one finishes (instead of after the
+        slowest), then the Gemini synthesis is streamed token by token.
+
+        Yields:
+            {"type": "tool", "name": ...} as each tool completes,
+            {"type": "token", "text": ...} for each Gemini chunk, then one
+            {"type": "final", "answer": ..., "debug": ...} event.
+        """
+        tools, tools_map = self._resolve_tools(tools, tools_map)
+
+        raw_output, tool_calls, thought_text = self._detect_intent(messages, tools)
+
+        if not tool_calls:
+            print("ℹ️ No tool calls detected. Switching to Gemini for chat.")
+            final_messages = self._build_chat_messages(messages, thought_text)
+            synthesis_tools = None
+            debug: Dict[str, Any] = {"calls": [], "data": []}
+            fallback = ""
+        else:
+            print(f"\n🛠️  TRIGGERED {len(tool_calls)} TOOL(S):")
+            results: List[str] = [""] * len(tool_calls)
+            for i, result in self._iter_tool_results(tool_calls, tools_map):
+                results[i] = result
+                yield {"type": "tool", "name": tool_calls[i]["name"]}
+            final_messages, debug = self._build_synthesis_messages(messages, raw_output, tool_calls, results)
+            synthesis_tools = tools
+            fallback = "Analysis complete. (No summary generated)"
+
+        print("📝 Streaming answer via Gemini...")
+        chunks: List[str] = []
+        for text in self.gemini.generate_stream(final_messages, synthesis_tools):
+            chunks.append(text)
+            yield {"type": "token", "text": text}
+
+        final_answer = "".join(chunks).strip() or fallback
+        yield {"type": "final", "answer": final_answer, "debug": debug}
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import redis
+
+from agentic_models.gemini import API_ERROR_ANSWER_PREFIX, UNEXPECTED_ERROR_ANSWER
+from agentic_tools.weather_tools import WEATHER_CACHE_TTL
+from main_configs import (
+    REDIS_URL,
+    SEMANTIC_CACHE_MODEL_ID,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Cacheability Rules
+# ============================================================
+# Only trajectories made exclusively of side-effect-free tools may be replayed.
+# `get_date` is side-effect-free but its answer goes stale within the TTL,
+# so it is deliberately left out. `show_all_segments` is too: its answer
+# changes whenever `manage_cdp_segment` creates or deletes a segment.
+READ_ONLY_TOOLS = frozenset({
+    "get_current_weather",
+    "get_current_weather_bulk",
+    "get_marketing_events",
+    "get_alert_types",
+})
+
+# Answers built from these tools expire no later than the tool's own data
+TOOL_TTL_CAPS: Dict[str, int] = {
+    "get_current_weather": WEATHER_CACHE_TTL,
+    "get_current_weather_bulk": WEATHER_CACHE_TTL,
+}
+
+KEY_PREFIX = "leo:chat_cache"
+MAX_SEMANTIC_ENTRIES = 2048
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse case and whitespace so trivially different prompts share a key."""
+    return " ".join(prompt.lower().split())
+
+
+def _is_error_result(result: Any) -> bool:
+    """True for a failed tool result: {"error": ...} or {"status": "error"}, raw or JSON-encoded."""
+    if isinstance(result, (str, bytes)):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return False
+    if isinstance(result, list):
+        return any(_is_error_result(item) for item in result)
+    return isinstance(result, dict) and ("error" in result or result.get("status") == "error")
+
+
+class SemanticCache:
+    """
+    Response cache placed in front of the /chat pipeline.
+
+    Lookup order:
+    1. Exact match on sha256(normalized prompt)  -> one Redis GET
+    2. Cosine similarity of prompt embeddings    -> best match above threshold
+
+    Answers live under per-prompt keys with a TTL. Embeddings are kept in one
+    Redis hash, with a sorted set of answer expiry times next to it: expired
+    entries are dropped on every write and, once MAX_SEMANTIC_ENTRIES is
+    reached, the soonest-to-expire entries make room for new ones.
+
+    Each process keeps a decoded copy of the embedding matrix tagged with a
+    Redis version counter that every write bumps, so a semantic lookup costs
+    one GET of the counter (batched with the exact-match GET) plus a
+    matrix-vector product; HGETALL only runs after the vectors changed.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        embedder: Optional[Callable[[str], np.ndarray]] = None,
+        ttl: int = SEMANTIC_CACHE_TTL,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        model_id: str = SEMANTIC_CACHE_MODEL_ID,
+        read_only_tools: Iterable[str] = READ_ONLY_TOOLS,
+        tool_ttl_caps: Mapping[str, int] = TOOL_TTL_CAPS,
+    ):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.model_id = model_id
+        self.read_only_tools = frozenset(read_only_tools)
+        self.tool_ttl_caps = dict(tool_ttl_caps)
+
+        self._embedder = embedder
+        self._embedder_lock = threading.Lock()
+
+        # (version, digests, matrix) of the last vectors hash read from Redis
+        self._matrix: Optional[Tuple[bytes, List[str], np.ndarray]] = None
+        self._matrix_lock = threading.Lock()
+
+        self.redis_client = redis_client
+        if self.redis_client is None:
+            try:
+                if REDIS_URL:
+                    self.redis_client = redis.from_url(REDIS_URL)
+                    self.redis_client.ping()
+                else:
+                    logger.warning("REDIS_URL is not set. Chat response cache is disabled.")
+            except Exception as e:
+                logger.warning("Redis connection failed. Chat response cache disabled. Error: %s", e)
+                self.redis_client = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis_client is not None
+
+    # ============================================================
+    # Keys & Embeddings
+    # ============================================================
+    @staticmethod
+    def _digest(prompt: str) -> str:
+        return hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _answer_key(digest: str) -> str:
+        return f"{KEY_PREFIX}:answer:{digest}"
+
+    @staticmethod
+    def _vectors_key() -> str:
+        return f"{KEY_PREFIX}:vectors"
+
+    @staticmethod
+    def _expiry_key() -> str:
+        return f"{KEY_PREFIX}:expiry"
+
+    @staticmethod
+    def _version_key() -> str:
+        return f"{KEY_PREFIX}:version"
+
+    def _embed(self, prompt: str) -> np.ndarray:
+        """Returns an L2-normalized float32 embedding, loading the model on first use."""
+        if self._embedder is None:
+            with self._embedder_lock:
+                if self._embedder is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info("Loading chat cache embedding model: %s", self.model_id)
+                    model = SentenceTransformer(self.model_id)
+                    self._embedder = lambda text: model.encode(text, normalize_embeddings=True)
+
+        vec = np.asarray(self._embedder(normalize_prompt(prompt)), dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _load_matrix(self, version: Optional[bytes]) -> Optional[Tuple[List[str], np.ndarray]]:
+        """Returns (digests, embedding matrix), re-reading Redis only when `version` moved."""
+        if version is None:
+            return None
+
+        with self._matrix_lock:
+            if self._matrix is not None and self._matrix[0] == version:
+                return self._matrix[1], self._matrix[2]
+
+        stored = self.redis_client.hgetall(self._vectors_key())
+        if not stored:
+            return None
+
+        digests = [d.decode("utf-8") if isinstance(d, bytes) else d for d in stored]
+        matrix = np.vstack([np.frombuffer(v, dtype=np.float32) for v in stored.values()])
+        with self._matrix_lock:
+            self._matrix = (version, digests, matrix)
+        return digests, matrix
+
+    def _remove(self, digests: List[Any]) -> None:
+        if not digests:
+            return
+        self.redis_client.hdel(self._vectors_key(), *digests)
+        self.redis_client.zrem(self._expiry_key(), *digests)
+        self.redis_client.incr(self._version_key())
+
+    def _evict(self) -> None:
+        """Drops vectors whose answer expired, then the soonest-to-expire ones over capacity."""
+        expiry_key = self._expiry_key()
+        self._remove(self.redis_client.zrangebyscore(expiry_key, "-inf", time.time()))
+
+        overflow = self.redis_client.zcard(expiry_key) - MAX_SEMANTIC_ENTRIES
+        if overflow > 0:
+            self._remove(self.redis_client.zrange(expiry_key, 0, overflow - 1))
+
+    # ============================================================
+    # Public API
+    # ============================================================
+    def is_cacheable(self, response: Dict[str, Any]) -> bool:
+        """
+        A response may be cached only if it called at least one tool, every tool
+        it called is read-only and succeeded, and the answer is not an error.
+
+        Tool-less answers are never cached: they include prompts whose tool
+        intent was missed, which would otherwise be replayed to similar prompts.
+        """
+        debug = response.get("debug", {})
+        calls = debug.get("calls", [])
+        if not calls or not all(c.get("name") in self.read_only_tools for c in calls):
+            return False
+        if any(_is_error_result(d.get("response")) for d in debug.get("data", [])):
+            return False
+
+        answer = (response.get("answer") or "").strip()
+        return bool(answer) and answer != UNEXPECTED_ERROR_ANSWER and not answer.startswith(API_ERROR_ANSWER_PREFIX)
+
+    def ttl_for(self, response: Dict[str, Any]) -> int:
+        """Cache TTL for a response: the default, capped by every tool it called."""
+        calls = response.get("debug", {}).get("calls", [])
+        caps = [self.tool_ttl_caps[c.get("name")] for c in calls if c.get("name") in self.tool_ttl_caps]
+        return min([self.ttl, *caps])
+
+    def get(self, prompt: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled or not prompt:
+            return None
+
+        try:
+            # 1. Exact fast path (the vectors version rides along in the same round trip)
+            digest = self._digest(prompt)
+            cached, version = self.redis_client.mget([self._answer_key(digest), self._version_key()])
+            if cached:
+                logger.info("⚡ Chat Cache Hit (exact) ✅")
+                return json.loads(cached)
+
+            # 2. Semantic path
+            loaded = self._load_matrix(version)
+            if loaded is None:
+                return None
+
+            digests, matrix = loaded
+            scores = matrix @ self._embed(prompt)
+            best = int(np.argmax(scores))
+
+            if scores[best] < self.threshold:
+                return None
+
+            best_digest = digests[best]
+            cached = self.redis_client.get(self._answer_key(best_digest))
+            if not cached:
+                # Answer expired: drop its vector so it stops matching
+                self._remove([best_digest])
+                return None
+
+            logger.info("⚡ Chat Cache Hit (semantic, score=%.3f) ✅", float(scores[best]))
+            return json.loads(cached)
+
+        except Exception as e:
+            logger.error("Chat cache read error: %s", e)
+            return None
+
+    def set(self, prompt: str, response: Dict[str, Any]) -> bool:
+        if not self.enabled or not prompt or not self.is_cacheable(response):
+            return False
+
+        try:
+            digest = self._digest(prompt)
+            ttl = self.ttl_for(response)
+            self.redis_client.setex(
+                self._answer_key(digest),
+                ttl,
+                json.dumps(response, default=str),
+            )
+
+            vectors_key, expiry_key = self._vectors_key(), self._expiry_key()
+            self.redis_client.hset(vectors_key, digest, self._embed(prompt).tobytes())
+            self.redis_client.zadd(expiry_key, {digest: time.time() + ttl})
+            self._evict()
+            self.redis_client.incr(self._version_key())
+            for key in (vectors_key, expiry_key):
+                self.redis_client.expire(key, self.ttl)
+            return True
+
+        except Exception as e:
+            logger.error("Chat cache write error: %s", e)
+            return False
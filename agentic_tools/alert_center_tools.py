@@ -6,9 +6,11 @@
 import logging
 from typing import Dict, Optional
 
+from agentic_tools.registry import tool
 
 logger = logging.getLogger("agentic_tools.alert_center")
 
+@tool
 def get_alert_types(tenant_id: Optional[str] = None) -> Dict[str, str]:
     """
     show all alert types for the given tenant.
@@ -1,12 +1,15 @@
 import logging
 import ssl
 import smtplib
-import requests
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from email.message import EmailMessage
 from email.utils import formataddr
 
 from agentic_tools.channels.activation import NotificationChannel
+from agentic_tools.http_client import pooled_requests as requests
 from main_configs import MarketingConfigs
 
 from agentic_tools.channels.helpers import (
@@ -16,6 +19,107 @@ from agentic_tools.channels.helpers import (
 
 logger = logging.getLogger(__name__)
 
+# Max in-flight HTTP API sends (Brevo / SendGrid) per campaign.
+# Keeps throughput high while staying under provider rate limits.
+EMAIL_SEND_CONCURRENCY = 8
+HTTP_PROVIDERS = ("brevo", "sendgrid")
+
+# ============================================================
+# 0. Transport: Persistent SMTP Connections
+# ============================================================
+
+class SMTPPool:
+    """
+    Keeps one authenticated SMTP connection per (server, account) and reuses it.
+
+    A fresh `smtplib.SMTP` per email pays TCP + EHLO + STARTTLS + AUTH every
+    time. Here a connection is opened lazily and reused until it has sent
+    `max_messages` or is older than `max_age` seconds. Connections idle longer
+    than `idle_check` seconds are probed with NOOP before reuse, and a send
+    that hits a dropped connection reconnects once.
+
+    `smtplib.SMTP` is looked up at connect time (not import time) so it can be
+    monkeypatched.
+    """
+
+    RECONNECTABLE_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+    def __init__(self, max_messages: int = 100, max_age: float = 60.0, idle_check: float = 5.0):
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.idle_check = idle_check
+        self._lock = threading.Lock()
+        # key -> [connection, created_at, last_used, sent_count]
+        self._connections: Dict[Tuple[Any, ...], List[Any]] = {}
+
+    def _connect(self, host: str, port: int, username: str, password: str, use_tls: bool, timeout: int):
+        server = smtplib.SMTP(host, port, timeout=timeout)
+        server.ehlo()
+        if use_tls:
+            server.starttls(context=ssl.create_default_context())
+            server.ehlo()
+        server.login(username, password)
+        return server
+
+    @staticmethod
+    def _close(server) -> None:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+    def _is_reusable(self, entry: List[Any], now: float) -> bool:
+        server, created_at, last_used, sent = entry
+        if sent >= self.max_messages or now - created_at > self.max_age:
+            return False
+        if now - last_used > self.idle_check:
+            try:
+                return server.noop()[0] == 250
+            except Exception:
+                return False
+        return True
+
+    def send_message(self, msg: EmailMessage, host: str, port: int, username: str,
+                     password: str, use_tls: bool = True, timeout: int = 10) -> None:
+        key = (smtplib.SMTP, host, port, username, use_tls)
+
+        with self._lock:
+            for attempt in range(2):
+                now = time.monotonic()
+                entry = self._connections.get(key)
+                if entry is not None and not self._is_reusable(entry, now):
+                    self._close(entry[0])
+                    entry = None
+                if entry is None:
+                    entry = [self._connect(host, port, username, password, use_tls, timeout), now, now, 0]
+                    self._connections[key] = entry
+
+                try:
+                    entry[0].send_message(msg)
+                    entry[2] = time.monotonic()
+                    entry[3] += 1
+                    return
+                except self.RECONNECTABLE_ERRORS:
+                    # Server dropped the session: reconnect once, then give up
+                    self._connections.pop(key, None)
+                    self._close(entry[0])
+                    if attempt == 1:
+                        raise
+                except Exception:
+                    self._connections.pop(key, None)
+                    self._close(entry[0])
+                    raise
+
+    def close_all(self) -> None:
+        with self._lock:
+            for entry in self._connections.values():
+                self._close(entry[0])
+            self._connections.clear()
+
+
+SMTP_POOL = SMTPPool()
+
+
 # ============================================================
 # 1. Data Logic: Profile Loader
 # ============================================================
@@ -144,20 +248,75 @@ class EmailChannel(NotificationChannel):
         msg["From"] = formataddr(("Notification", self.smtp_username))
         msg.set_content(body, subtype='html')
 
-        ctx = ssl.create_default_context()
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=timeout) as server:
-                server.ehlo()
-                if self.smtp_use_tls:
-                    server.starttls(context=ctx)
-                    server.ehlo()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            # Reuses an authenticated connection across messages and campaigns
+            SMTP_POOL.send_message(
+                msg,
+                host=self.smtp_host,
+                port=self.smtp_port,
+                username=self.smtp_username,
+                password=self.smtp_password,
+                use_tls=self.smtp_use_tls,
+                timeout=timeout,
+            )
             return {"status": "success", "provider": "smtp"}
         except Exception as e:
             logger.error(f"SMTP Error: {e}")
             return {"status": "error", "provider": "smtp", "message": str(e)}
 
+    # ---------------------------------------------------------
+    # Fan-out
+    # ---------------------------------------------------------
+    def _send_one(self, user: Dict[str, Any], template_content: str, subject: str,
+                  provider: str, timeout: int, renderer: MessageRenderer) -> bool:
+        email = user.get("email")
+
+        # Personalize content
+        personalized_body = renderer.render_email_template(template_content, user)
+
+        # Route to provider
+        try:
+            if provider == "brevo":
+                res = self.send_via_brevo_api([email], subject, personalized_body, timeout)
+            elif provider == "sendgrid":
+                res = self.send_via_sendgrid_api([email], subject, personalized_body, timeout)
+            else:
+                res = self.send_via_smtp([email], subject, personalized_body, timeout)
+
+            if res.get("status") == "success":
+                return True
+            logger.warning(f"Failed to send to {email}: {res.get('message')}")
+            return False
+
+        except Exception:
+            logger.exception(f"Unexpected error sending to {email}")
+            return False
+
+    def send_many(self, recipient_objects: List[Dict[str, Any]], template_content: str,
+                  subject: str, provider: str, timeout: int = 10) -> Dict[str, int]:
+        """
+        Sends one personalized email per recipient.
+
+        HTTP API providers are called concurrently (bounded by
+        EMAIL_SEND_CONCURRENCY) over the shared keep-alive session, so a
+        campaign takes ~max(latency) per wave instead of sum(latency).
+        SMTP stays sequential on a single connection.
+        """
+        users = [u for u in recipient_objects if u.get("email")]
+        renderer = MessageRenderer()
+
+        def _one(user: Dict[str, Any]) -> bool:
+            return self._send_one(user, template_content, subject, provider, timeout, renderer)
+
+        if provider in HTTP_PROVIDERS and len(users) > 1:
+            with ThreadPoolExecutor(max_workers=min(EMAIL_SEND_CONCURRENCY, len(users))) as pool:
+                results = list(pool.map(_one, users))
+        else:
+            results = [_one(u) for u in users]
+
+        success = sum(results)
+        return {"success": success, "failed": len(results) - success}
+
     # ---------------------------------------------------------
     # Orchestrator
     # ---------------------------------------------------------
@@ -184,38 +343,9 @@ class EmailChannel(NotificationChannel):
         if not recipient_objects:
             return {"status": "skipped", "reason": "no_recipients_found"}
 
-        # --- Step 3: Iterate and Send ---
+        # --- Step 3: Render and Send ---
         logger.info(f"[Email] Sending to {len(recipient_objects)} recipients via {provider}...")
-        
-        stats = {"success": 0, "failed": 0}
-
-        for user in recipient_objects:
-            email = user.get("email")
-            if not email:
-                continue
-
-            # Personalize content
-            renderer = MessageRenderer()
-            personalized_body = renderer.render_email_template(template_content, user)
-
-            # Route to provider
-            try:
-                if provider == "brevo":
-                    res = self.send_via_brevo_api([email], subject, personalized_body, timeout)
-                elif provider == "sendgrid":
-                    res = self.send_via_sendgrid_api([email], subject, personalized_body, timeout)
-                else:
-                    res = self.send_via_smtp([email], subject, personalized_body, timeout)
-
-                if res.get("status") == "success":
-                    stats["success"] += 1
-                else:
-                    stats["failed"] += 1
-                    logger.warning(f"Failed to send to {email}: {res.get('message')}")
-
-            except Exception as e:
-                logger.exception(f"Unexpected error sending to {email}")
-                stats["failed"] += 1
+        stats = self.send_many(recipient_objects, template_content, subject, provider, timeout)
 
         # --- Step 4: Summary ---
         logger.info(f"[Email] Completed. Success: {stats['success']}, Failed: {stats['failed']}")
@@ -1,9 +1,9 @@
 
 import logging
-import requests
 from typing import Any
 
 from agentic_tools.channels.activation import NotificationChannel
+from agentic_tools.http_client import pooled_requests as requests
 from main_configs import MarketingConfigs
 
 logger = logging.getLogger(__name__)
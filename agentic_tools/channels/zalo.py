@@ -1,12 +1,14 @@
 
 import logging
-import requests
 import re
+import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Tuple
 
 from agentic_tools.channels.activation import NotificationChannel
+from agentic_tools.http_client import pooled_requests as requests
 
 
 from main_configs import MarketingConfigs
@@ -14,6 +16,25 @@ from main_configs import MarketingConfigs
 
 logger = logging.getLogger(__name__)
 
+# Retry policy for transient ZNS failures (network errors, 429, 5xx):
+# delay = min(cap, base * 2^attempt) * jitter, with jitter in [0.5, 1.5)
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Per-recipient ZNS sends in flight (ZNS takes one phone per request)
+ZALO_SEND_CONCURRENCY = 16
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry `attempt` (0-based). Honors a numeric Retry-After header."""
+    if retry_after:
+        try:
+            return min(RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)) * (0.5 + random.random())
+
 
 def get_user_contact_from_cdp(segment_id: str) -> Optional[list]:
     """
@@ -35,10 +56,11 @@ class ZaloOAChannel(NotificationChannel):
     CONNECTOR_NAME = "LEO Zalo Connector"
     COLLECTION_NAME = "cdp_dataconnector"
 
-    def __init__(self, override_token: str = None):
+    def __init__(self, override_token: str = None, max_retries: Optional[int] = None):
         # -------- Database Connection --------
         # FIXME profile must load from PGSQL later
-        
+        self.db = None
+
         self.zns_url = "https://business.openapi.zalo.me/message/template"
         self.oauth_url = "https://oauth.zaloapp.com/v4/oa/access_token"
         
@@ -49,70 +71,41 @@ class ZaloOAChannel(NotificationChannel):
         # Token Management
         self.access_token = override_token or MarketingConfigs.ZALO_OA_TOKEN
         self.refresh_token = MarketingConfigs.ZALO_OA_REFRESH_TOKEN
+        self.max_retries = MarketingConfigs.ZALO_OA_MAX_RETRIES if max_retries is None else max_retries
+
+        # Serializes token refresh across send workers: refresh tokens are single-use
+        self._refresh_lock = threading.Lock()
 
         # Always try to load the initial state from DB if available
         if self.db:
             self._load_tokens_from_db()
 
 
-    def send(self, segment_id: str, message: str = None, **kwargs):
+    def send(self, recipient_segment: str, message: str = None, **kwargs):
         """
         Main Execution Flow (Test Mode)
+
+        Recipients come from `kwargs["recipients"]` (list of {"phone", "firstName"})
+        or the CDP segment, and are sent concurrently over the pooled Session.
         """
-        logger.info(f"[Zalo] Starting TEST MODE send to segment: {segment_id}")
+        logger.info(f"[Zalo] Starting TEST MODE send to segment: {recipient_segment}")
         
         # 1. Fetch Recipients
-        recipients = get_user_contact_from_cdp(segment_id)
+        recipients = kwargs.get("recipients") or get_user_contact_from_cdp(recipient_segment)
         if not recipients:
-            return {"status": "warning", "message": f"No profiles found in '{segment_id}'"}
+            return {"status": "warning", "message": f"No profiles found in '{recipient_segment}'"}
 
-        stats = {"sent": 0, "failed": 0, "invalid_phone": 0}
+        # 2. Fan out & tally
+        workers = min(ZALO_SEND_CONCURRENCY, len(recipients))
+        if workers <= 1:
+            outcomes = [self._send_one(p) for p in recipients]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zalo-zns") as executor:
+                outcomes = list(executor.map(self._send_one, recipients))
 
-        # 2. Loop & Send
-        for p in recipients:
-            phone = self._format_phone_for_zalo(p.get('phone'))
-            name = p.get('firstName', 'Customer')
-
-            if not phone:
-                stats["invalid_phone"] += 1
-                continue
-
-            # Construct Payload
-            # NOTE: Ensure keys like 'customer_name' match your ZNS Template exactly!
-            # 1. Generate a random 6-digit OTP
-            generated_otp = str(random.randint(100000, 999999))
-
-            # 2. Construct Payload
-            payload = {
-                "phone": phone,
-                "template_id": self.template_id,
-                "template_data": {
-                    # Zalo requires the key to match "otp" exactly
-                    "otp": generated_otp,
-                },
-                "tracking_id": f"track_{int(time.time())}_{phone}"
-            }
-
-            # 3. Attempt 1 Send
-            success, error_code, result_msg = self._execute_zns_call(payload)
-
-            # 4. Auto-Refresh Logic
-            if not success and error_code == -124:
-                logger.warning(f"[Zalo] Token expired for {phone}. Refreshing and Retrying...")
-                if self._refresh_access_token():
-                    # Attempt 2 (Retry with new token)
-                    success, error_code, result_msg = self._execute_zns_call(payload)
-                else:
-                    logger.error("[Zalo] Token refresh failed. Aborting retry.")
-
-            # 5. Handle Final Result
-            if success:
-                stats["sent"] += 1
-                # NOTE: In real mode, consider saving verified phones
-                # self._save_verified_phone(phone, name, result_msg)
-            else:
-                stats["failed"] += 1
-                logger.warning(f"[Zalo] Failed to send to {phone}. Error: {error_code} - {result_msg}")
+        stats = {"sent": 0, "failed": 0, "invalid_phone": 0}
+        for outcome in outcomes:
+            stats[outcome] += 1
 
         return {
             "status": "success", 
@@ -120,6 +113,61 @@ class ZaloOAChannel(NotificationChannel):
             "stats": stats
         }
 
+    def _send_one(self, p: Dict[str, Any]) -> str:
+        """Sends one ZNS message. Returns the stats bucket: 'sent', 'failed' or 'invalid_phone'."""
+        phone = self._format_phone_for_zalo(p.get('phone'))
+
+        if not phone:
+            return "invalid_phone"
+
+        # Construct Payload
+        # NOTE: Ensure keys like 'customer_name' match your ZNS Template exactly!
+        # 1. Generate a random 6-digit OTP
+        generated_otp = str(random.randint(100000, 999999))
+
+        # 2. Construct Payload
+        payload = {
+            "phone": phone,
+            "template_id": self.template_id,
+            "template_data": {
+                # Zalo requires the key to match "otp" exactly
+                "otp": generated_otp,
+            },
+            "tracking_id": f"track_{int(time.time())}_{phone}"
+        }
+
+        # 3. Attempt 1 Send
+        token_used = self.access_token
+        success, error_code, result_msg = self._execute_zns_call(payload)
+
+        # 4. Auto-Refresh Logic
+        if not success and error_code == -124:
+            logger.warning(f"[Zalo] Token expired for {phone}. Refreshing and Retrying...")
+            if self._refresh_if_stale(token_used):
+                # Attempt 2 (Retry with new token)
+                success, error_code, result_msg = self._execute_zns_call(payload)
+            else:
+                logger.error("[Zalo] Token refresh failed. Aborting retry.")
+
+        # 5. Handle Final Result
+        if success:
+            # NOTE: In real mode, consider saving verified phones
+            # self._save_verified_phone(phone, p.get('firstName', 'Customer'), result_msg)
+            return "sent"
+
+        logger.warning(f"[Zalo] Failed to send to {phone}. Error: {error_code} - {result_msg}")
+        return "failed"
+
+    def _refresh_if_stale(self, token_used: str) -> bool:
+        """
+        Refreshes the access token unless another worker already did since
+        `token_used` was read (concurrent -124s must not burn the refresh token twice).
+        """
+        with self._refresh_lock:
+            if self.access_token != token_used:
+                return True
+            return self._refresh_access_token()
+
     
     def _execute_zns_call(self, payload: Dict) -> Tuple[bool, int, str]:
         """
@@ -145,7 +193,7 @@ class ZaloOAChannel(NotificationChannel):
         logger.info("----------------------------------------------")
 
         try:
-            resp = requests.post(self.zns_url, json=payload, headers=headers, timeout=15)
+            resp = self._post_with_backoff(payload, headers)
             data = resp.json()
             
             # 3. DEBUG LOGS: Print exactly what Zalo replied
@@ -170,6 +218,33 @@ class ZaloOAChannel(NotificationChannel):
             return False, -999, str(e)
         
         
+    def _post_with_backoff(self, payload: Dict, headers: Dict):
+        """
+        POSTs to ZNS, retrying only transient failures with exponential backoff + jitter.
+
+        Retried: connection errors, timeouts, HTTP 429 and 5xx.
+        Not retried: other 4xx and Zalo business errors (returned in the JSON body).
+        """
+        attempt = 0
+        while True:
+            try:
+                resp = requests.post(self.zns_url, json=payload, headers=headers, timeout=15)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning("[Zalo] Transient network error (%s). Retry %d/%d in %.2fs",
+                               e, attempt + 1, self.max_retries, delay)
+            else:
+                if resp.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return resp
+                delay = backoff_delay(attempt, resp.headers.get("Retry-After"))
+                logger.warning("[Zalo] HTTP %s from ZNS. Retry %d/%d in %.2fs",
+                               resp.status_code, attempt + 1, self.max_retries, delay)
+
+            time.sleep(delay)
+            attempt += 1
+
     def _refresh_access_token(self) -> bool:
         """
         1. Reads latest Refresh Token from DB.
@@ -1,10 +1,13 @@
 import logging
 from typing import Dict, Literal, Any, Optional
 
+from agentic_tools.registry import tool
+
 # Configure logger
 logger = logging.getLogger("agentic_tools.customer_data")
 
 
+@tool
 def show_all_segments(tenant_id: Optional[str] = None, limit: Optional[int] = 5) -> Dict[str, str]:
     """
     show all segments in the CDP for the given tenant.
@@ -27,6 +30,7 @@ def show_all_segments(tenant_id: Optional[str] = None, limit: Optional[int] = 5)
                 ]
     return segments
 
+@tool
 def manage_cdp_segment(
     segment_identifier: str,
     action: Literal["create", "update", "delete"] = "create"
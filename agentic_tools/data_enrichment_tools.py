@@ -1,8 +1,11 @@
 import logging
 from typing import Dict
 
+from agentic_tools.registry import tool
+
 logger = logging.getLogger("agentic_tools.data_enrichment")
 
+@tool
 def analyze_segment(segment_identifier: str) -> Dict[str, str]:
     """
     Analyze all data profiles belonging to a specific customer segment.
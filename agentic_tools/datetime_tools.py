@@ -1,9 +1,19 @@
-from datetime import date, datetime
+from datetime import datetime
 import logging
-from typing import Dict, Optional
+import time
+from typing import Dict, Optional, Tuple
+
+from agentic_tools.registry import tool
 
 logger = logging.getLogger("agentic_tools.datetime")
 
+# (epoch second, input_date, payload) of the last call. Every field of the
+# payload has one-second resolution, so calls within the same wall-clock
+# second reuse it instead of re-running now()/today()/strftime.
+_DATE_CACHE: Optional[Tuple[int, Optional[str], Dict[str, str]]] = None
+
+
+@tool
 def get_date(input_date: Optional[str] = None) -> Dict[str, str]:
     """
     Get date or retrieves the current server date and time.
@@ -19,17 +29,28 @@ def get_date(input_date: Optional[str] = None) -> Dict[str, str]:
     Returns:
         A dictionary containing current_date, timestamp, day_of_week, and resolved_date.
     """
-    today_obj = date.today()
-    now_obj = datetime.now()
+    global _DATE_CACHE
+
+    now_ts = time.time()
+    second = int(now_ts)
+
+    cached = _DATE_CACHE
+    if cached is not None and cached[0] == second and cached[1] == input_date:
+        return dict(cached[2])
+
+    now_obj = datetime.fromtimestamp(now_ts)
+    today_obj = now_obj.date()
     
     today_str = str(today_obj)
     
     # Logic to handle the optional input
     resolved_input = input_date if input_date else today_str
 
-    return {
+    payload = {
         "current_date": today_str,
         "timestamp": now_obj.strftime("%Y-%m-%d %H:%M:%S"),
         "day_of_week": now_obj.strftime("%A"),
         "resolved_date": resolved_input,
-    }
\ No newline at end of file
+    }
+    _DATE_CACHE = (second, input_date, payload)
+    return dict(payload)
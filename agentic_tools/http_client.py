@@ -0,0 +1,59 @@
+import logging
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Shared HTTP Session
+# ============================================================
+# `requests.get` / `requests.post` build a throwaway Session per call, so every
+# outbound request pays a fresh TCP + TLS handshake. Tools and channels share
+# this pooled Session instead so keep-alive connections are reused.
+POOL_CONNECTIONS = 50
+POOL_MAXSIZE = 50
+
+
+def build_session(
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
+    max_retries: Any = 0,
+) -> requests.Session:
+    """Creates a Session with a keep-alive connection pool mounted for http(s)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PooledRequests:
+    """
+    Drop-in stand-in for the `requests` module whose `get` / `post` go through
+    a pooled Session.
+
+    Modules import it as `requests`, so call sites stay `requests.post(...)`
+    and tests that monkeypatch `<module>.requests.post` still bind. Everything
+    else (exceptions, `codes`, ...) is delegated to the real module.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or build_session()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.post(url, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(requests, name)
+
+
+pooled_requests = PooledRequests()
@@ -1,12 +1,15 @@
 import logging
 import re
-from typing import Dict, Any, Type, Optional, List, Literal
+import threading
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Type, Optional, List, Literal
 
 from agentic_tools.channels.activation import NotificationChannel
 from agentic_tools.channels.facebook import FacebookPageChannel
 from agentic_tools.channels.push_notification import MobilePushChannel, WebPushChannel
 from agentic_tools.channels.zalo import ZaloOAChannel
 from agentic_tools.channels.email import EmailChannel
+from agentic_tools.registry import tool
 
 logger = logging.getLogger("agentic_tools.marketing_tools")
 
@@ -74,11 +77,43 @@ def normalize_channel_key(key: str) -> str:
 class ActivationManager:
     """Factory for dispatching messages to various notification channels."""
 
+    # One long-lived instance per channel, built on first use. Channels keep
+    # only config / token state, so sharing them across calls is safe and
+    # saves a constructor (config reads, token setup) per activation.
+    _instances: Dict[str, NotificationChannel] = {}
+    _instances_lock = threading.Lock()
+
+    # Canonical key -> bound `send` of the cached instance. A warm, already
+    # canonical key dispatches with one dict lookup and skips normalization.
+    _dispatch: Dict[str, Callable[..., Dict[str, Any]]] = {}
+
     @classmethod
     def list_channels(cls) -> List[str]:
         """Returns list of canonical channel names."""
         return list(CHANNEL_REGISTRY.keys())
 
+    @classmethod
+    def register_channel(cls, key: str, channel_cls: Type[NotificationChannel]) -> None:
+        """Adds or replaces a channel class; its cached instance is rebuilt on next use."""
+        with cls._instances_lock:
+            CHANNEL_REGISTRY[key] = channel_cls
+            cls._instances.pop(key, None)
+            cls._dispatch.pop(key, None)
+
+    @classmethod
+    def get_channel(cls, key: str) -> NotificationChannel:
+        """Returns the shared instance for a canonical channel key."""
+        channel = cls._instances.get(key)
+        if channel is None:
+            with cls._instances_lock:
+                channel = cls._instances.get(key)
+                if channel is None:
+                    logger.debug("Initializing channel class: %s", CHANNEL_REGISTRY[key].__name__)
+                    channel = CHANNEL_REGISTRY[key]()
+                    cls._instances[key] = channel
+                    cls._dispatch[key] = channel.send
+        return channel
+
     @classmethod
     def execute(
         cls,
@@ -87,20 +122,23 @@ class ActivationManager:
         message: str,
         **kwargs: Any,
     ) -> Dict[str, Any]:
-        # Normalize within execute to ensure internal calls are safe
-        resolved = normalize_channel_key(channel_key)
+        # Fast path: canonical key whose channel is already built
+        send = cls._dispatch.get(channel_key)
+        resolved = channel_key
 
-        if resolved not in CHANNEL_REGISTRY:
-            error_msg = f"Unknown channel '{channel_key}'. Valid options: {cls.list_channels()}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
+        if send is None:
+            # Normalize within execute to ensure internal calls are safe
+            resolved = normalize_channel_key(channel_key)
 
-        channel_cls = CHANNEL_REGISTRY[resolved]
+            if resolved not in CHANNEL_REGISTRY:
+                error_msg = f"Unknown channel '{channel_key}'. Valid options: {cls.list_channels()}"
+                logger.error(error_msg)
+                raise ValueError(error_msg)
 
         try:
-            logger.debug("Initializing channel class: %s", channel_cls.__name__)
-            # Instance and send
-            response = channel_cls().send(
+            if send is None:
+                send = cls.get_channel(resolved).send
+            response = send(
                 recipient_segment=segment,
                 message=message,
                 **kwargs,
@@ -120,6 +158,7 @@ class ActivationManager:
 # Tool Definition for Gemma / LLMs
 # =====================================================
 
+@tool
 def activate_channel(
     channel: Literal["email", "zalo_oa", "mobile_push", "web_push", "facebook_page"], 
     recipient_segment: str, 
@@ -194,7 +233,21 @@ def activate_channel(
         }
         
 
-def get_marketing_events(tenant_id: Optional[str] = None, location: Optional[str] = None) -> Dict[str, str]:
+# TODO: Replace with real API call to fetch marketing events.
+# Static catalog built once at import instead of on every tool call.
+# Entries are read-only views; callers get fresh dict copies.
+MARKETING_EVENTS = tuple(MappingProxyType(event) for event in (
+    {"event_id": "me_001", "name": "Summer Sale 2026"},
+    {"event_id": "me_002", "name": "Black Friday 2026"},
+    {"event_id": "me_003", "name": "New Year Promo 2026"},
+    {"event_id": "me_004", "name": "Back to School 2026"},
+    {"event_id": "me_005", "name": "Holiday Specials 2026"},
+    {"event_id": "me_006", "name": "Flash Deals 2026"},
+))
+
+
+@tool
+def get_marketing_events(tenant_id: Optional[str] = None, location: Optional[str] = None) -> List[Dict[str, str]]:
     """
     show all marketing events for the given tenant.
 
@@ -208,12 +261,4 @@ def get_marketing_events(tenant_id: Optional[str] = None, location: Optional[str
 
     logger.info("show all marketing events for the given tenant_id: %s location: %s", tenant_id, location)
 
-    # TODO: Replace with real API call to fetch marketing events
-    marketing_events = [{"event_id": "me_001", "name": "Summer Sale 2026"},
-                        {"event_id": "me_002", "name": "Black Friday 2026"},
-                        {"event_id": "me_003", "name": "New Year Promo 2026"},
-                        {"event_id": "me_004", "name": "Back to School 2026"},
-                        {"event_id": "me_005", "name": "Holiday Specials 2026"},
-                        {"event_id": "me_006", "name": "Flash Deals 2026"}
-                ]
-    return marketing_events
\ No newline at end of file
+    return [dict(event) for event in MARKETING_EVENTS]
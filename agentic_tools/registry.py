@@ -0,0 +1,45 @@
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger("agentic_tools.registry")
+
+# ============================================================
+# LLM Tool Registry
+# ============================================================
+# Tool modules register their LLM-callable functions with @tool, so the
+# name -> function map is assembled at import instead of hand-maintained.
+AVAILABLE_TOOLS: Dict[str, Callable[..., Any]] = {}
+
+SCHEMA_ATTR = "__tool_schema__"
+
+
+def tool(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Registers `fn` in AVAILABLE_TOOLS under its function name."""
+    name = fn.__name__
+    if name in AVAILABLE_TOOLS and AVAILABLE_TOOLS[name] is not fn:
+        logger.warning("Tool '%s' registered twice; keeping the latest definition.", name)
+    AVAILABLE_TOOLS[name] = fn
+    setattr(fn, SCHEMA_ATTR, None)
+    return fn
+
+
+def tool_schema(fn: Any) -> Dict[str, Any]:
+    """
+    JSON schema for a tool callable, generated from its signature and docstring
+    once and then stored on the function object. Dict schemas pass through.
+    """
+    if isinstance(fn, dict):
+        return fn
+
+    schema = getattr(fn, SCHEMA_ATTR, None)
+    if schema is None:
+        # transformers is heavy; only import it once a schema is actually needed
+        from transformers.utils import get_json_schema
+
+        schema = get_json_schema(fn)
+        try:
+            setattr(fn, SCHEMA_ATTR, schema)
+        except AttributeError:
+            # Builtins / bound methods cannot carry attributes: recompute next time
+            pass
+    return schema
@@ -1,25 +1,14 @@
-
-from typing import Dict, Any
-
 from agentic_tools.alert_center_tools import get_alert_types
 from agentic_tools.customer_data_tools import manage_cdp_segment, show_all_segments
 from agentic_tools.data_enrichment_tools import analyze_segment
 from agentic_tools.datetime_tools import get_date
 from agentic_tools.marketing_tools import activate_channel, get_marketing_events
-from agentic_tools.weather_tools import get_current_weather
+from agentic_tools.weather_tools import get_current_weather, get_current_weather_bulk
+from agentic_tools.registry import AVAILABLE_TOOLS
 
 
 # =====================================================
 # LLM-CALLABLE TOOLS (With Mandatory Docstrings)
 # =====================================================
-
-AVAILABLE_TOOLS: Dict[str, Any] = {
-    "get_date": get_date,
-    "get_current_weather": get_current_weather,
-    "get_marketing_events": get_marketing_events,
-    "get_alert_types": get_alert_types,
-    "manage_cdp_segment": manage_cdp_segment,
-    "analyze_segment": analyze_segment,
-    "show_all_segments": show_all_segments,
-    "activate_channel": activate_channel,
-}
\ No newline at end of file
+# Each function above registers itself with @tool when its module is imported;
+# AVAILABLE_TOOLS maps tool name -> callable and is re-exported from the registry.
@@ -1,8 +1,24 @@
+import asyncio
+import json
 import logging
-import requests
+import os
 import re
+import sqlite3
+import threading
+import time
 import unicodedata
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping, Tuple
+
+import orjson
+from urllib3.util.retry import Retry
+
+from agentic_tools.http_client import PooledRequests, build_session
+from agentic_tools.registry import tool
+from main_configs import GEOCODE_CACHE_PATH, GEOCODE_CACHE_TTL
 
 # ============================================================
 # Logging
@@ -13,6 +29,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger("agentic_tools.weather_tools")
 
+# ============================================================
+# HTTP
+# ============================================================
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Dedicated keep-alive pool for Open-Meteo. GETs are idempotent, so transient
+# gateway / rate-limit errors are retried at the adapter level.
+requests = PooledRequests(build_session(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"GET"}),
+    ),
+))
+
 # ============================================================
 # Canonical aliases
 # ============================================================
@@ -23,14 +58,68 @@ CITY_ALIASES = {
     "tphcm": "ho chi minh city",
     "danang": "da nang",
     "hn": "hanoi",
-    "ha noi": "hanoi"
+    "ha noi": "hanoi",
+    "sai gon": "ho chi minh city",
+    "tp hcm": "ho chi minh city",
+    "tp ho chi minh": "ho chi minh city",
+    "ho chi minh": "ho chi minh city",
+    "dalat": "da lat",
 }
 
+# Trailing words that do not change which city is meant ("Hanoi, Vietnam", "HCM city")
+LOCATION_QUALIFIERS = frozenset({"city", "vietnam", "viet", "nam", "vn", "thanh", "pho"})
+
 VIETNAM_KEYWORDS = {"viet", "vietnam", "vn", "tphcm", "hcm", "saigon", "hanoi", "danang"}
 
+# ============================================================
+# Weather response cache
+# ============================================================
+# Current conditions change slowly; repeat lookups for the same place within
+# the TTL are served from memory instead of two Open-Meteo round trips.
+WEATHER_CACHE_TTL = 300  # seconds
+WEATHER_CACHE_MAX_ENTRIES = 1024
+
+# Fan-out for get_current_weather_bulk (bounded by the Open-Meteo pool size)
+WEATHER_BULK_MAX_WORKERS = 8
+
+# Geocoding fallback queries of one lookup are sent concurrently on their own
+# pool (bulk workers block on it, so it must not be the bulk pool).
+GEOCODE_MAX_WORKERS = 16
+_GEOCODE_EXECUTOR = ThreadPoolExecutor(max_workers=GEOCODE_MAX_WORKERS, thread_name_prefix="geocode")
+
+_WEATHER_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_WEATHER_CACHE_LOCK = threading.Lock()
+
+
+def _weather_cache_get(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    with _WEATHER_CACHE_LOCK:
+        entry = _WEATHER_CACHE.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at >= WEATHER_CACHE_TTL:
+            del _WEATHER_CACHE[key]
+            return None
+        _WEATHER_CACHE.move_to_end(key)
+        return result
+
+
+def _weather_cache_put(key: Tuple[str, str], result: Dict[str, Any]) -> None:
+    with _WEATHER_CACHE_LOCK:
+        _WEATHER_CACHE[key] = (time.monotonic(), result)
+        _WEATHER_CACHE.move_to_end(key)
+        while len(_WEATHER_CACHE) > WEATHER_CACHE_MAX_ENTRIES:
+            _WEATHER_CACHE.popitem(last=False)
+
 # ============================================================
 # Normalization helpers
 # ============================================================
+_WORD_RE = re.compile(r"\w+")
+
+
+# Same handful of strings come back on every lookup (user input, canonical
+# names, Open-Meteo result names), so results are memoized.
+@lru_cache(maxsize=4096)
 def normalize_text(text: str) -> str:
     """
     Normalize text for geocoding.
@@ -38,29 +127,80 @@ def normalize_text(text: str) -> str:
     Steps:
     - Lowercase
     - Vietnamese-specific letter normalization (đ → d)
-    - Unicode NFKD normalization
-    - Remove diacritics
-    - Remove punctuation
-    - Collapse whitespace
+    - Unicode NFKD normalization + diacritics removal (skipped for pure ASCII)
+    - Keep word runs only: punctuation dropped, whitespace collapsed
     """
-    text = text.strip().lower()
+    # "Đ".lower() is "đ", so one replace covers both cases
+    text = text.lower().replace("đ", "d")
 
     # 🔴 CRITICAL: Vietnamese-specific normalization
-    text = text.replace("đ", "d").replace("Đ", "d")
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+
+    # Single regex pass == sub(non-word → " ") + collapse whitespace + strip
+    return " ".join(_WORD_RE.findall(text))
 
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(c for c in text if not unicodedata.combining(c))
-    text = re.sub(r"[^\w\s]", " ", text)
-    text = re.sub(r"\s+", " ", text)
 
-    return text.strip()
+class CityTrie:
+    """
+    Word-level trie over normalized city aliases.
+
+    Each edge is a whole token rather than a single character, so a lookup
+    costs one dict hop per word and multi-word aliases ("tp ho chi minh")
+    share their prefixes.
+    """
 
+    __slots__ = ("children", "canonical")
+
+    def __init__(self):
+        self.children: Dict[str, "CityTrie"] = {}
+        self.canonical: Optional[str] = None
+
+    def insert(self, alias: str, canonical: str) -> None:
+        node = self
+        for token in alias.split():
+            node = node.children.setdefault(token, CityTrie())
+        node.canonical = canonical
+
+    def longest_prefix_match(self, tokens: List[str]) -> Tuple[Optional[str], int]:
+        """Returns (canonical, tokens consumed) for the longest alias prefixing `tokens`."""
+        node, best, consumed = self, None, 0
+        for i, token in enumerate(tokens):
+            node = node.children.get(token)
+            if node is None:
+                break
+            if node.canonical is not None:
+                best, consumed = node.canonical, i + 1
+        return best, consumed
+
+
+def build_city_trie(aliases: Dict[str, str]) -> CityTrie:
+    trie = CityTrie()
+    for alias, canonical in aliases.items():
+        trie.insert(alias, canonical)
+        trie.insert(canonical, canonical)
+    return trie
+
+
+CITY_TRIE = build_city_trie(CITY_ALIASES)
+
+# Whole-name hits ("saigon", "ha noi", "da nang") are the common case: one
+# probe here skips tokenizing and walking the trie. Frozen at import.
+_EXACT_ALIASES: Dict[str, str] = {
+    **{canonical: canonical for canonical in CITY_ALIASES.values()},
+    **CITY_ALIASES,
+}
 
 
+@lru_cache(maxsize=4096)
 def canonicalize_city_name(raw: str) -> str:
     """
     Convert a city name to its canonical form using alias mapping.
 
+    The longest known alias at the start of the name wins, as long as the
+    remaining words are only qualifiers ("Saigon, Vietnam", "HCM city").
+
     Args:
         raw: Original user-provided city name.
 
@@ -68,7 +208,16 @@ def canonicalize_city_name(raw: str) -> str:
         Canonical city name suitable for geocoding.
     """
     normalized = normalize_text(raw)
-    return CITY_ALIASES.get(normalized, normalized)
+    exact = _EXACT_ALIASES.get(normalized)
+    if exact is not None:
+        return exact
+
+    tokens = normalized.split()
+
+    canonical, consumed = CITY_TRIE.longest_prefix_match(tokens)
+    if canonical is not None and all(t in LOCATION_QUALIFIERS for t in tokens[consumed:]):
+        return canonical
+    return normalized
 
 
 def looks_vietnamese(text: str) -> bool:
@@ -84,9 +233,99 @@ def looks_vietnamese(text: str) -> bool:
     t = normalize_text(text)
     return any(k in t for k in VIETNAM_KEYWORDS)
 
+# ============================================================
+# Geocoding cache
+# ============================================================
+class GeocodeCache:
+    """
+    Persistent normalized-name → coordinates cache backed by SQLite.
+
+    Falls back to a process-local dict when `path` is empty or the database
+    cannot be opened (read-only home, sandboxed CI, ...).
+    """
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH, ttl: int = GEOCODE_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if not path:
+            return
+        try:
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Geocode disk cache unavailable (%s); using in-memory cache.", e)
+            self._conn = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                entry = self._memory.get(key)
+                return entry[1] if entry and entry[0] > now else None
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM geocode WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Geocode cache read error: %s", e)
+                return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            if self._conn is None:
+                self._memory[key] = (expires_at, value)
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO geocode (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Geocode cache write error: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM geocode")
+                self._conn.commit()
+
+
+GEOCODE_CACHE = GeocodeCache()
+
 # ============================================================
 # Geocoding
 # ============================================================
+# In-process tier in front of GEOCODE_CACHE: each (name, language) query hits
+# Open-Meteo at most once per process, even across different user spellings
+# that canonicalize to the same name. Failures raise and are not cached.
+@lru_cache(maxsize=4096)
+def _geocode_attempt(name: str, language: str) -> Tuple[Mapping[str, Any], ...]:
+    params = {
+        "name": name,
+        "count": 5,
+        "language": language,
+        "format": "json"
+    }
+    resp = requests.get(GEOCODING_URL, params=params, timeout=5)
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+    # Read-only views: the cached results are shared between callers
+    return tuple(MappingProxyType(r) for r in data.get("results") or ())
+
+
 def get_coordinates(city_name: str) -> Optional[Dict[str, Any]]:
     """
     Resolve a city name to geographic coordinates.
@@ -104,39 +343,29 @@ def get_coordinates(city_name: str) -> Optional[Dict[str, Any]]:
         Dictionary containing latitude, longitude, resolved name, and country
         if successful; otherwise None.
     """
-    geo_url = "https://geocoding-api.open-meteo.com/v1/search"
+    cache_key = normalize_text(city_name)
+    cached = GEOCODE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
     canonical = canonicalize_city_name(city_name)
     country_bias = "VN" if looks_vietnamese(city_name) else None
 
-    attempts = [
-        {"name": city_name, "language": "en"},
-        {"name": city_name, "language": "vi"},
-        {"name": canonical, "language": "vi"},
-        {"name": canonical, "language": "en"},
-    ]
+    # dict.fromkeys: de-duplicated, attempt order kept for tie-breaking
+    attempts = list(dict.fromkeys([
+        (city_name, "en"),
+        (city_name, "vi"),
+        (canonical, "vi"),
+        (canonical, "en"),
+    ]))
 
-    seen = set()
+    # Latency is the slowest attempt rather than the sum of all of them
+    futures = [_GEOCODE_EXECUTOR.submit(_geocode_attempt, *attempt) for attempt in attempts]
     candidates: List[Dict[str, Any]] = []
 
-    for attempt in attempts:
-        key = (attempt["name"], attempt["language"])
-        if key in seen:
-            continue
-        seen.add(key)
-
+    for attempt, future in zip(attempts, futures):
         try:
-            params = {
-                "name": attempt["name"],
-                "count": 5,
-                "language": attempt["language"],
-                "format": "json"
-            }
-            resp = requests.get(geo_url, params=params, timeout=5)
-            resp.raise_for_status()
-            data = resp.json()
-
-            for r in data.get("results", []):
+            for r in future.result():
                 score = 0
 
                 if country_bias and r.get("country_code") == country_bias:
@@ -163,7 +392,7 @@ def get_coordinates(city_name: str) -> Optional[Dict[str, Any]]:
                     "country_code": r.get("country_code", "")
                 })
 
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             logger.warning(f"Geocoding error for {attempt}: {e}")
 
     if not candidates:
@@ -178,11 +407,27 @@ def get_coordinates(city_name: str) -> Optional[Dict[str, Any]]:
         f"({best['lat']}, {best['lon']}) score={best['score']}"
     )
 
+    GEOCODE_CACHE.set(cache_key, best)
     return best
 
 # ============================================================
 # Weather helpers
 # ============================================================
+# Built once at import rather than re-created on every lookup
+WMO_CODES: Dict[int, str] = {
+    0: "Clear sky",
+    1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
+    45: "Fog", 48: "Depositing rime fog",
+    51: "Light drizzle", 53: "Moderate drizzle", 55: "Dense drizzle",
+    61: "Slight rain", 63: "Moderate rain", 65: "Heavy rain",
+    71: "Slight snow", 73: "Moderate snow", 75: "Heavy snow",
+    95: "Thunderstorm", 96: "Thunderstorm with hail"
+}
+
+# Same table indexed by code (WMO codes are 0-99; gaps are None)
+_WMO_DESCRIPTIONS: Tuple[Optional[str], ...] = tuple(WMO_CODES.get(code) for code in range(100))
+
+
 def get_weather_description(code: int) -> str:
     """
     Convert WMO weather codes into human-readable descriptions.
@@ -193,20 +438,17 @@ def get_weather_description(code: int) -> str:
     Returns:
         Textual description of the weather condition.
     """
-    wmo_codes = {
-        0: "Clear sky",
-        1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
-        45: "Fog", 48: "Depositing rime fog",
-        51: "Light drizzle", 53: "Moderate drizzle", 55: "Dense drizzle",
-        61: "Slight rain", 63: "Moderate rain", 65: "Heavy rain",
-        71: "Slight snow", 73: "Moderate snow", 75: "Heavy snow",
-        95: "Thunderstorm", 96: "Thunderstorm with hail"
-    }
-    return wmo_codes.get(code, "Unknown")
+    try:
+        description = _WMO_DESCRIPTIONS[code] if code >= 0 else None
+    except (IndexError, TypeError):
+        # Out of range, missing, or a non-int code (e.g. 3.0)
+        description = WMO_CODES.get(code)
+    return description or "Unknown"
 
 # ============================================================
 # Public tool function (REQUIRES DOCSTRING)
 # ============================================================
+@tool
 def get_current_weather(location: str, unit: str = "celsius") -> Dict[str, Any]:
     """
     Get the current weather for a city or location name.
@@ -230,11 +472,16 @@ def get_current_weather(location: str, unit: str = "celsius") -> Dict[str, Any]:
     if unit not in {"celsius", "fahrenheit"}:
         return {"status": "error", "message": "Invalid unit"}
 
+    cache_key = (canonicalize_city_name(location), unit)
+    cached = _weather_cache_get(cache_key)
+    if cached is not None:
+        # Same place, different spelling → keep the caller's input in the payload
+        return {**cached, "location": {**cached["location"], "input": location}}
+
     coords = get_coordinates(location)
     if not coords:
         return {"status": "error", "message": f"Location not found: {location}"}
 
-    weather_url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude": coords["lat"],
         "longitude": coords["lon"],
@@ -243,12 +490,12 @@ def get_current_weather(location: str, unit: str = "celsius") -> Dict[str, Any]:
     }
 
     try:
-        resp = requests.get(weather_url, params=params, timeout=10)
+        resp = requests.get(FORECAST_URL, params=params, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
         current = data.get("current_weather", {})
 
-        return {
+        result = {
             "status": "success",
             "location": {
                 "input": location,
@@ -267,7 +514,57 @@ def get_current_weather(location: str, unit: str = "celsius") -> Dict[str, Any]:
             },
             "source": "Open-Meteo"
         }
+        _weather_cache_put(cache_key, result)
+        return result
 
-    except requests.RequestException as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         logger.error(f"Weather API error: {e}")
         return {"status": "error", "message": "Weather service unreachable"}
+
+
+@tool
+def get_current_weather_bulk(locations: List[str], unit: str = "celsius") -> List[Dict[str, Any]]:
+    """
+    Get the current weather for several cities or locations at once.
+
+    Use this instead of calling get_current_weather repeatedly when the user
+    asks about more than one place (e.g., "compare Hanoi, Da Nang and HCMC").
+    Lookups run concurrently.
+
+    Args:
+        locations: List of city or place names (e.g., ["Hanoi", "Da Nang"]).
+        unit: Temperature unit, either "celsius" or "fahrenheit".
+
+    Returns:
+        A list with one get_current_weather result per location, in input order.
+    """
+    if isinstance(locations, str):
+        # A bare name (e.g. a mis-parsed tool call) is one location, not a list of characters
+        locations = [locations]
+    if not locations:
+        return []
+    if len(locations) == 1:
+        return [get_current_weather(locations[0], unit)]
+
+    workers = min(WEATHER_BULK_MAX_WORKERS, len(locations))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather") as executor:
+        return list(executor.map(lambda loc: get_current_weather(loc, unit), locations))
+
+
+# ============================================================
+# Async entry points (for event-loop callers, not LLM tools)
+# ============================================================
+async def aget_current_weather(location: str, unit: str = "celsius") -> Dict[str, Any]:
+    """Non-blocking get_current_weather: runs on a worker thread over the shared pool."""
+    return await asyncio.to_thread(get_current_weather, location, unit)
+
+
+async def aget_current_weather_bulk(locations: List[str], unit: str = "celsius") -> List[Dict[str, Any]]:
+    """Concurrent lookups from an event loop, at most WEATHER_BULK_MAX_WORKERS in flight, input order kept."""
+    sem = asyncio.Semaphore(WEATHER_BULK_MAX_WORKERS)
+
+    async def _one(loc: str) -> Dict[str, Any]:
+        async with sem:
+            return await aget_current_weather(loc, unit)
+
+    return list(await asyncio.gather(*[_one(loc) for loc in locations]))
@@ -1,41 +1,93 @@
 """FastAPI application factory and middleware setup."""
 
+import asyncio
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Optional
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from agentic_models.router import AgentRouter
+from agentic_models.semantic_cache import SemanticCache
 from main_configs import (
+    AGENT_THREAD_POOL_SIZE,
     CORS_ALLOW_CREDENTIALS,
     CORS_ALLOW_HEADERS,
     CORS_ALLOW_METHODS,
+    CORS_ALLOW_ORIGIN_REGEX,
     CORS_ALLOW_ORIGINS,
     MAIN_APP_DESCRIPTION,
     MAIN_APP_TITLE,
     MAIN_APP_VERSION,
+    SEMANTIC_CACHE_ENABLED,
 )
 
 logger = logging.getLogger("LEO Activation API")
 
+# Placeholder rendered into the index template so the static markup can be
+# prerendered once and only the cache-busting timestamp spliced in per request.
+_TIMESTAMP_MARKER = "__LEO_INDEX_TIMESTAMP__"
 
-def create_app() -> FastAPI:
+
+class PingEndpoint:
+    """
+    Health check as a raw ASGI app.
+
+    Starlette treats non-function endpoints as ASGI apps, so this bypasses
+    request parsing, dependency resolution and response_model serialization.
+    The body and headers are prebuilt once.
+    """
+
+    BODY = b'{"status":"ok"}'
+    HEADERS = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(BODY)).encode("ascii")),
+    ]
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": self.HEADERS})
+        await send({"type": "http.response.body", "body": self.BODY})
+
+
+def prerender_index(templates: Jinja2Templates, name: str = "test.html"):
+    """
+    Render the index template once and split it around the timestamp.
+
+    Returns:
+        (head, tail) tuple, or None if the template does not contain the
+        timestamp placeholder exactly once.
+    """
+    html = templates.get_template(name).render(timestamp=_TIMESTAMP_MARKER)
+    parts = html.split(_TIMESTAMP_MARKER)
+    if len(parts) != 2:
+        return None
+    return parts[0], parts[1]
+
+
+def create_app(router_factory: Optional[Callable[[], AgentRouter]] = None) -> FastAPI:
     """
     Factory function to create and configure the FastAPI application.
 
     Includes:
+    - Bounded thread pool for blocking agent work
     - CORS middleware
     - Static files and templates
     - Health check endpoint
     - Root endpoint
-    - Agent router setup
+    - Agent router setup (built at startup, off the import path)
+    - /chat response cache
     - API routes
 
+    Args:
+        router_factory: Zero-arg callable returning the AgentRouter. Defaults to
+            `AgentRouter(mode="auto")`; tests inject dummies here to skip model loading.
+
     Returns:
         Configured FastAPI application instance
     """
@@ -43,14 +95,37 @@ def create_app() -> FastAPI:
         title=MAIN_APP_TITLE,
         description=MAIN_APP_DESCRIPTION,
         version=MAIN_APP_VERSION,
+        # orjson serializes large debug payloads (and datetimes/UUIDs) in C
+        default_response_class=ORJSONResponse,
     )
 
+    # --------------------
+    # Agent Thread Pool
+    # --------------------
+    # Blocking agent work is dispatched with asyncio.to_thread, which uses the
+    # loop's default executor. Size it explicitly so concurrency is bounded.
+    @app.on_event("startup")
+    async def _install_agent_executor():
+        executor = ThreadPoolExecutor(
+            max_workers=AGENT_THREAD_POOL_SIZE,
+            thread_name_prefix="leo-agent",
+        )
+        asyncio.get_running_loop().set_default_executor(executor)
+        app.state.agent_executor = executor
+
+    @app.on_event("shutdown")
+    async def _shutdown_agent_executor():
+        executor = getattr(app.state, "agent_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
     # --------------------
     # CORS Middleware
     # --------------------
     app.add_middleware(
         CORSMiddleware,
         allow_origins=CORS_ALLOW_ORIGINS,
+        allow_origin_regex=CORS_ALLOW_ORIGIN_REGEX,
         allow_credentials=CORS_ALLOW_CREDENTIALS,
         allow_methods=CORS_ALLOW_METHODS,
         allow_headers=CORS_ALLOW_HEADERS,
@@ -70,18 +145,21 @@ def create_app() -> FastAPI:
             name="resources",
         )
 
+    app.state.index_parts = None
     if templates_dir.exists():
         app.state.templates = Jinja2Templates(directory=templates_dir)
+        try:
+            app.state.index_parts = prerender_index(app.state.templates)
+        except Exception:
+            logger.exception("Failed to prerender index template; falling back to per-request render")
     else:
         app.state.templates = None
 
     # --------------------
     # Health Check
     # --------------------
-    @app.get("/ping")
-    def ping():
-        """Health check endpoint."""
-        return {"status": "ok"}
+    # Registered as a pure ASGI route; app-level middleware (CORS) still wraps it.
+    app.router.add_route("/ping", PingEndpoint(), methods=["GET"], include_in_schema=False)
 
     # --------------------
     # Root Endpoint
@@ -94,6 +172,11 @@ def create_app() -> FastAPI:
             return HTMLResponse(API_HEAD, status_code=200)
 
         ts = int(time.time())
+        index_parts = request.app.state.index_parts
+        if index_parts:
+            head, tail = index_parts
+            return HTMLResponse(f"{head}{ts}{tail}", status_code=200)
+
         return request.app.state.templates.TemplateResponse(
             "test.html",
             {"request": request, "timestamp": ts},
@@ -102,15 +185,28 @@ def create_app() -> FastAPI:
     # --------------------
     # Agent Router Setup
     # --------------------
-    agent_router = AgentRouter(mode="auto")
-    app.state.agent_router = agent_router
+    # Loading Gemma/Gemini is slow, so it happens in a startup hook (in a worker
+    # thread) instead of on every create_app() call.
+    from api.handlers import create_api_router, init_agent_router
+
+    app.state.router_factory = router_factory or (lambda: AgentRouter(mode="auto"))
+    app.state.agent_router = None
+    app.state.agent_router_lock = asyncio.Lock()
+
+    @app.on_event("startup")
+    async def _init_agent_router():
+        await init_agent_router(app)
 
     # --------------------
-    # API Routes
+    # Chat Response Cache
     # --------------------
-    from api.handlers import create_api_router
+    chat_cache = SemanticCache() if SEMANTIC_CACHE_ENABLED else None
+    app.state.chat_cache = chat_cache
 
-    api_router = create_api_router(agent_router)
+    # --------------------
+    # API Routes
+    # --------------------
+    api_router = create_api_router(chat_cache=chat_cache)
     app.include_router(api_router)
 
     return app
@@ -3,20 +3,30 @@ API Route Handlers for LEO Activation Agent.
 
 This module defines the FastAPI router that exposes:
 1. /chat: Natural language interface (User -> Router -> Tools -> User).
+   /chat/stream: Same pipeline, with the final answer streamed as Server-Sent Events.
 2. /tool_calling: Direct programmatic execution of tools (App -> Tool -> Result).
 3. /data/sync-segment: Direct endpoint to trigger profile synchronization (ArangoDB -> PGSQL).
 4. /test/zalo-direct: Direct integration testing for Zalo.
 """
 
+import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, Optional
 
-from fastapi import APIRouter, HTTPException, Body
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Body, FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 # --- IMPORTS ---
 from agentic_models.router import AgentRouter
+from agentic_models.semantic_cache import SemanticCache
+from api.schemas import (
+    ChatRequest,
+    ChatResponse,
+    SyncRequest,
+    ToolCallingRequest,
+    ZaloTestRequest,
+)
 from agentic_tools.alert_center_tools import get_alert_types
 from agentic_tools.customer_data_tools import show_all_segments
 from agentic_tools.data_enrichment_tools import analyze_segment
@@ -25,6 +35,7 @@ from agentic_tools.tools import (
     AVAILABLE_TOOLS,
     activate_channel,
     get_current_weather,
+    get_current_weather_bulk,
     get_date,
     manage_cdp_segment,
 )
@@ -45,67 +56,33 @@ except ImportError:
 logger = logging.getLogger("LEO Activation API")
 
 
-# ============================================================
-# Data Models (Schemas)
-# ============================================================
-
-class ChatRequest(BaseModel):
-    """Schema for natural language chat requests."""
-    prompt: Union[str, List[Dict[str, Any]]] = Field(
-        ...,
-        description="User query string OR a list of message history objects.",
-        json_schema_extra={
-            "example": "Sync profiles for the 'VIP Users' segment and send them a Zalo message."
-        },
-    )
-
-class ToolCallingRequest(BaseModel):
-    """Schema for direct tool execution requests."""
-    tool_name: str = Field(..., description="The exact function name of the tool to execute.")
-    tool_args: Dict[str, Any] = Field(default_factory=dict, description="Dictionary of arguments to pass to the tool.")
-
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "tool_name": "sync_segment_to_db",
-                "tool_args": {"segment_id": "seg_vip_users_01"}
-            }
+# Constants
+LOG_PROMPT_MAX_CHARS = 200
+HELP_DOCUMENTATION_URL = '<a href="https://leocdp.com/documents" target="_blank" rel="noopener noreferrer"> https://leocdp.com/documents </a>'
+HELP_MESSAGE = f"Please refer to the documentation at {HELP_DOCUMENTATION_URL} for assistance."
+HELP_CONTENT: Dict[str, Any] = {"answer": HELP_MESSAGE, "debug": {"calls": [], "data": []}}
+
+# /chat and /tool_calling return ORJSONResponse directly (response_model=None):
+# the AgentRouter result is already in the ChatResponse shape, so FastAPI's
+# jsonable_encoder walk and response-model validation are skipped. ChatResponse
+# stays documented in OpenAPI through `responses=`.
+CHAT_RESPONSES: Dict[int, Dict[str, Any]] = {200: {"model": ChatResponse}}
+
+
+def build_chat_response(response: Dict[str, Any]) -> ORJSONResponse:
+    """Serializes an AgentRouter result ({'answer', 'debug'}) straight to JSON with orjson."""
+    debug = response["debug"]
+    return ORJSONResponse(
+        content={
+            "answer": response["answer"],
+            "debug": {"calls": debug["calls"], "data": debug["data"]},
         }
-    }
-
-class SyncRequest(BaseModel):
-    """Schema for direct data synchronization requests."""
-    segment_id: str = Field(..., description="The ID of the segment to synchronize from ArangoDB to Postgres.")
-    data_sync_api_key: Optional[str] = Field(
-        None,
-        description="API key for authenticating the sync request."
     )
 
-class ToolCallDebug(BaseModel):
-    name: str
-    arguments: Dict[str, Any]
-
-class ToolResultDebug(BaseModel):
-    name: str
-    response: Any
 
-class DebugInfo(BaseModel):
-    calls: List[ToolCallDebug]
-    data: List[ToolResultDebug]
-
-class ChatResponse(BaseModel):
-    """Standard response format for Chat and Tool Calling endpoints."""
-    answer: str = Field(..., description="The natural language synthesis or direct result.")
-    debug: DebugInfo = Field(..., description="Technical details of tool execution.")
-
-class ZaloTestRequest(BaseModel):
-    segment_name: str
-    message: Optional[str] = None
-    kwargs: Optional[Dict[str, Any]] = {}
-
-# Constants
-HELP_DOCUMENTATION_URL = '<a href="https://leocdp.com/documents" target="_blank" rel="noopener noreferrer"> https://leocdp.com/documents </a>'
-HELP_MESSAGE = f"Please refer to the documentation at {HELP_DOCUMENTATION_URL} for assistance."
+def sse_frame(event: Dict[str, Any]) -> bytes:
+    """Encodes one event as a Server-Sent Events `data:` frame."""
+    return f"data: {json.dumps(event, default=str)}\n\n".encode("utf-8")
 
 
 # ============================================================
@@ -125,85 +102,135 @@ def sync_segment_to_db(segment_id: str) -> str:
         str: A status message indicating success or failure.
     """
     try:
-        logger.info(f"Agent triggering sync for segment: {segment_id}")
+        logger.info("Agent triggering sync for segment: %s", segment_id)
         run_synch_profiles(segment_id=segment_id)
         return f"Successfully synchronized profiles for segment '{segment_id}' from LEO CDP to PostgreSQL."
     except Exception as e:
-        logger.exception(f"Sync failed for segment {segment_id}")
+        logger.exception("Sync failed for segment %s", segment_id)
         return f"Failed to synchronize segment '{segment_id}'. Error: {str(e)}"
 
 
 # ============================================================
-# Router Setup
+# Tool Registry (built once at import)
 # ============================================================
 
-def create_api_router(agent_router: AgentRouter) -> APIRouter:
-    """
-    Create and configure the FastAPI router.
+# Tools available to the Agent. Kept as a module-level tuple so the engines
+# can memoize the generated JSON schemas across requests.
+TOOLS = (
+    get_date,
+    get_current_weather,
+    get_current_weather_bulk,
+    get_marketing_events,
+    get_alert_types,
+    manage_cdp_segment,
+    activate_channel,
+    analyze_segment,
+    show_all_segments,
+    sync_segment_to_db,
+)
 
-    Args:
-        agent_router: An initialized instance of AgentRouter.
 
-    Returns:
-        APIRouter: Configured router with chat, tool, and test endpoints.
-    """
-    router = APIRouter()
-
-    # 1. Define the List of Tools available to the Agent
-    # Added 'sync_segment_to_db' to the list so the AI knows about it.
-    tools = [
-        get_date,
-        get_current_weather,
-        get_marketing_events,
-        get_alert_types,
-        manage_cdp_segment,
-        activate_channel,
-        analyze_segment,
-        show_all_segments,
-        sync_segment_to_db  # <--- NEW TOOL REGISTERED HERE
-    ]
-    
-    # 2. Map Tool Names to Actual Functions
+def build_tools_map() -> Dict[str, Any]:
+    """Map tool names to callables: the shared registry plus the API-local tools."""
     tools_map = AVAILABLE_TOOLS.copy()
-    
+
     # Ensure local tools are in the map
     local_tools = {
         "show_all_segments": show_all_segments,
         "analyze_segment": analyze_segment,
-        "sync_segment_to_db": sync_segment_to_db,  # <--- NEW TOOL MAPPED HERE
+        "sync_segment_to_db": sync_segment_to_db,
     }
-    
+
     for name, func in local_tools.items():
         if name not in tools_map:
             tools_map[name] = func
 
+    return tools_map
+
+
+TOOLS_MAP = build_tools_map()
+
+
+# ============================================================
+# Agent Router Lifecycle
+# ============================================================
+
+async def init_agent_router(app: FastAPI) -> AgentRouter:
+    """
+    Builds the app's AgentRouter on first use and registers the tool set.
+
+    Model loading is blocking, so the factory runs in a worker thread. Normally
+    this is triggered by the startup hook; endpoints call it too so a
+    TestClient used without its context manager still gets a router.
+    """
+    agent_router = getattr(app.state, "agent_router", None)
+    if agent_router is not None:
+        return agent_router
+
+    async with app.state.agent_router_lock:
+        if app.state.agent_router is None:
+            router_factory: Callable[[], AgentRouter] = app.state.router_factory
+            agent_router = await asyncio.to_thread(router_factory)
+            # Register once: schemas are precomputed and endpoints no longer pass tools per request
+            agent_router.register_tools(TOOLS, TOOLS_MAP)
+            app.state.agent_router = agent_router
+
+    return app.state.agent_router
+
+
+async def get_agent_router(request: Request) -> AgentRouter:
+    return await init_agent_router(request.app)
+
+
+# ============================================================
+# Router Setup
+# ============================================================
+
+def create_api_router(chat_cache: Optional[SemanticCache] = None) -> APIRouter:
+    """
+    Create and configure the FastAPI router.
+
+    The AgentRouter is not passed in: endpoints resolve it from
+    `request.app.state.agent_router`, which is built at startup.
+
+    Args:
+        chat_cache: Optional response cache consulted by /chat for plain prompts.
+
+    Returns:
+        APIRouter: Configured router with chat, tool, and test endpoints.
+    """
+    router = APIRouter()
+
+    tools_map = TOOLS_MAP
+
     # ========================================================
     # 1. Direct Tool Calling Endpoint
     # ========================================================
-    @router.post("/tool_calling", response_model=ChatResponse, summary="Execute a specific tool directly")
-    async def tool_calling_endpoint(payload: ToolCallingRequest):
+    @router.post(
+        "/tool_calling",
+        response_model=None,
+        responses=CHAT_RESPONSES,
+        summary="Execute a specific tool directly",
+    )
+    async def tool_calling_endpoint(payload: ToolCallingRequest, request: Request):
         try:
             logger.info("🔧 Direct Tool Call: %s | Args: %s", payload.tool_name, payload.tool_args)
 
             if payload.tool_name not in tools_map:
                 raise HTTPException(status_code=400, detail=f"Tool '{payload.tool_name}' not found.")
 
-            response = agent_router.handle_tool_calling(
+            agent_router = await get_agent_router(request)
+
+            # Run the blocking tool + LLM work off the event loop
+            response = await asyncio.to_thread(
+                agent_router.handle_tool_calling,
                 tool_calling_json={
                     "tool_name": payload.tool_name,
                     "args": payload.tool_args
                 },
-                tools=tools,
-                tools_map=tools_map,
             )
 
-            return ChatResponse(
-                answer=response["answer"],
-                debug=DebugInfo(
-                    calls=[ToolCallDebug(**c) for c in response["debug"]["calls"]],
-                    data=[ToolResultDebug(**d) for d in response["debug"]["data"]],
-                ),
-            )
+            return build_chat_response(response)
         except HTTPException:
             raise
         except Exception as e:
@@ -213,21 +240,34 @@ def create_api_router(agent_router: AgentRouter) -> APIRouter:
     # ========================================================
     # 2. Chat Endpoint (Agentic)
     # ========================================================
-    @router.post("/chat", response_model=ChatResponse, summary="Natural Language Agent Interface")
-    async def chat_endpoint(payload: ChatRequest):
+    @router.post(
+        "/chat",
+        response_model=None,
+        responses=CHAT_RESPONSES,
+        summary="Natural Language Agent Interface",
+    )
+    async def chat_endpoint(payload: ChatRequest, request: Request):
         try:
             input_content = payload.prompt
+            cache_prompt = None
             
             # --- HELP COMMAND SHORTCUT ---
             if isinstance(input_content, str):
                 cleaned_prompt = input_content.strip()
-                logger.info("Incoming chat prompt: %s", cleaned_prompt)
+                # Lazy %-formatting; truncation only runs when INFO is enabled
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Incoming chat prompt: %s", cleaned_prompt[:LOG_PROMPT_MAX_CHARS])
                 
                 if cleaned_prompt.lower() == "help":
-                    return ChatResponse(
-                        answer=HELP_MESSAGE,
-                        debug=DebugInfo(calls=[], data=[]),
-                    )
+                    return ORJSONResponse(content=HELP_CONTENT)
+
+                # --- RESPONSE CACHE (plain prompts only) ---
+                if chat_cache is not None and chat_cache.enabled:
+                    cached = await asyncio.to_thread(chat_cache.get, cleaned_prompt)
+                    if cached:
+                        return build_chat_response(cached)
+                    cache_prompt = cleaned_prompt
+
                 messages = [{"role": "user", "content": cleaned_prompt}]
             
             elif isinstance(input_content, list):
@@ -237,24 +277,67 @@ def create_api_router(agent_router: AgentRouter) -> APIRouter:
                 raise HTTPException(status_code=400, detail="Invalid prompt format.")
 
             # --- AGENT EXECUTION ---
-            response = agent_router.handle_message(
-                messages,
-                tools=tools,
-                tools_map=tools_map,
-            )
+            agent_router = await get_agent_router(request)
+            # Model calls run in worker threads; tool calls run concurrently
+            response = await agent_router.ahandle_message(messages)
 
-            return ChatResponse(
-                answer=response["answer"],
-                debug=DebugInfo(
-                    calls=[ToolCallDebug(**c) for c in response["debug"]["calls"]],
-                    data=[ToolResultDebug(**d) for d in response["debug"]["data"]],
-                ),
-            )
+            # Only successful trajectories made of read-only tools are stored
+            if cache_prompt:
+                await asyncio.to_thread(chat_cache.set, cache_prompt, response)
+
+            return build_chat_response(response)
 
         except Exception as e:
             logger.exception("Chat endpoint execution failed")
             raise HTTPException(status_code=500, detail=str(e))
 
+    # ========================================================
+    # 2b. Streaming Chat Endpoint (Server-Sent Events)
+    # ========================================================
+    @router.post("/chat/stream", summary="Natural Language Agent Interface (streamed)")
+    async def chat_stream_endpoint(payload: ChatRequest, request: Request):
+        """
+        Streams the answer as `text/event-stream`.
+
+        Each Gemini chunk is sent as `data: {"type": "token", "text": ...}`;
+        the last frame is `data: {"type": "final", "answer": ..., "debug": ...}`.
+        """
+        input_content = payload.prompt
+
+        if isinstance(input_content, str):
+            cleaned_prompt = input_content.strip()
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Incoming streamed chat prompt: %s", cleaned_prompt[:LOG_PROMPT_MAX_CHARS])
+
+            if cleaned_prompt.lower() == "help":
+                help_event = {"type": "final", **HELP_CONTENT}
+                return StreamingResponse(iter([sse_frame(help_event)]), media_type="text/event-stream")
+
+            messages = [{"role": "user", "content": cleaned_prompt}]
+        elif isinstance(input_content, list):
+            logger.info("Incoming streamed chat history with %d messages", len(input_content))
+            messages = input_content
+        else:
+            raise HTTPException(status_code=400, detail="Invalid prompt format.")
+
+        agent_router = await get_agent_router(request)
+
+        def event_stream() -> Iterator[bytes]:
+            # Sync generator: Starlette iterates it in a worker thread, so the
+            # blocking Gemma / tool / Gemini calls stay off the event loop.
+            try:
+                for event in agent_router.handle_message_streaming(messages):
+                    yield sse_frame(event)
+            except Exception as e:
+                logger.exception("Streaming chat execution failed")
+                yield sse_frame({"type": "error", "detail": str(e)})
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     # ========================================================
     # 3. Data Synchronization Endpoint (Direct)
     # ========================================================
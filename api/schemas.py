@@ -0,0 +1,75 @@
+"""
+Request / response schemas for the LEO Activation API.
+
+Declared at module scope so each model's pydantic-core validator and
+serializer are built exactly once at import, regardless of how many times
+`create_app()` / `create_api_router()` are called.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+# ============================================================
+# Data Models (Schemas)
+# ============================================================
+
+class ChatRequest(BaseModel):
+    """Schema for natural language chat requests."""
+    prompt: Union[str, List[Dict[str, Any]]] = Field(
+        ...,
+        description="User query string OR a list of message history objects.",
+        json_schema_extra={
+            "example": "Sync profiles for the 'VIP Users' segment and send them a Zalo message."
+        },
+    )
+
+class ToolCallingRequest(BaseModel):
+    """Schema for direct tool execution requests."""
+    tool_name: str = Field(..., description="The exact function name of the tool to execute.")
+    tool_args: Dict[str, Any] = Field(default_factory=dict, description="Dictionary of arguments to pass to the tool.")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "tool_name": "sync_segment_to_db",
+                "tool_args": {"segment_id": "seg_vip_users_01"}
+            }
+        }
+    }
+
+class SyncRequest(BaseModel):
+    """Schema for direct data synchronization requests."""
+    segment_id: str = Field(..., description="The ID of the segment to synchronize from ArangoDB to Postgres.")
+    data_sync_api_key: Optional[str] = Field(
+        None,
+        description="API key for authenticating the sync request."
+    )
+
+# Internal debug wrappers: slotted, frozen stdlib dataclasses (no per-instance
+# __dict__). Used by ChatResponse to document the response shape in OpenAPI.
+@dataclass(slots=True, frozen=True)
+class ToolCallDebug:
+    name: str
+    arguments: Dict[str, Any]
+
+@dataclass(slots=True, frozen=True)
+class ToolResultDebug:
+    name: str
+    response: Any
+
+@dataclass(slots=True, frozen=True)
+class DebugInfo:
+    calls: List[ToolCallDebug]
+    data: List[ToolResultDebug]
+
+class ChatResponse(BaseModel):
+    """Standard response format for Chat and Tool Calling endpoints."""
+    answer: str = Field(..., description="The natural language synthesis or direct result.")
+    debug: DebugInfo = Field(..., description="Technical details of tool execution.")
+
+class ZaloTestRequest(BaseModel):
+    segment_name: str
+    message: Optional[str] = None
+    kwargs: Optional[Dict[str, Any]] = {}
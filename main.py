@@ -1,12 +1,36 @@
 import uvicorn
-from main_app import app
-from main_configs import MAIN_APP_HOST, MAIN_APP_PORT
+from main_configs import APP_ENV, MAIN_APP_HOST, MAIN_APP_PORT, MAIN_APP_WORKERS
 
-## Uvicorn runner (runtime only) for local development and testing
+# Import string so uvicorn can re-import the app in reload / worker processes
+APP_IMPORT_PATH = "main_app:app"
+
+
+def __getattr__(name):
+    # `uvicorn main:app` (start scripts, README) still resolves. Loaded lazily so
+    # `python main.py` does not build the app (and its models) in the supervisor.
+    if name == "app":
+        from main_app import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+## Uvicorn runner (runtime only)
 if __name__ == "__main__":
-    uvicorn.run(
-        app,
-        host=MAIN_APP_HOST,
-        port=MAIN_APP_PORT,
-        reload=True,
-    )
\ No newline at end of file
+    if APP_ENV in ("dev", "development", "local"):
+        # Local development: single process with auto-reload
+        uvicorn.run(
+            APP_IMPORT_PATH,
+            host=MAIN_APP_HOST,
+            port=MAIN_APP_PORT,
+            reload=True,
+        )
+    else:
+        # Production: one process per core, uvloop event loop, httptools parser
+        uvicorn.run(
+            APP_IMPORT_PATH,
+            host=MAIN_APP_HOST,
+            port=MAIN_APP_PORT,
+            workers=MAIN_APP_WORKERS,
+            loop="uvloop",
+            http="httptools",
+            log_level="info",
+        )
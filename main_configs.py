@@ -1,8 +1,10 @@
 import logging
 import os
-from typing import Optional
+from typing import List, Optional
 
 from dotenv import load_dotenv
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings
 
 # ============================================================
 # Environment bootstrap
@@ -12,12 +14,183 @@ from dotenv import load_dotenv
 load_dotenv(override=True)
 
 
+# ============================================================
+# Typed Settings (resolved once at import)
+# ============================================================
+class AppSettings(BaseSettings):
+    """
+    Single source of truth for application configuration.
+
+    Design choice:
+    - Every env var is read and type-converted exactly once, here
+    - Defaults live on the fields, not in scattered os.getenv() calls
+    - Invalid numeric values fail fast at import with a validation error
+    """
+
+    # --------------------------------------------------------
+    # Logging
+    # --------------------------------------------------------
+    # Expected: DEBUG, INFO, WARNING, ERROR (invalid values fall back to INFO)
+    LOG_LEVEL: str = Field(default="INFO")
+
+    # --------------------------------------------------------
+    # Application Metadata
+    # --------------------------------------------------------
+    MAIN_APP_HOST: str = Field(default="0.0.0.0")
+    MAIN_APP_PORT: int = Field(default=8000)
+
+    # Runtime environment: "development" runs a single auto-reloading process,
+    # anything else runs multi-worker uvloop + httptools (see main.py)
+    APP_ENV: str = Field(default="development")
+    MAIN_APP_WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+
+    # Descriptive metadata (used by FastAPI / OpenAPI)
+    MAIN_APP_TITLE: str = Field(default="LEO Activation API")
+    MAIN_APP_DESCRIPTION: str = Field(default="LEO Activation Chatbot for LEO CDP with Function Calling")
+    MAIN_APP_VERSION: str = Field(default="1.0.0")
+
+    # Worker threads used to run blocking agent work (LLM calls, tool I/O)
+    # off the event loop. Bounds how many /chat requests are processed concurrently.
+    AGENT_THREAD_POOL_SIZE: int = Field(default=16)
+
+    # --------------------------------------------------------
+    # CORS
+    # --------------------------------------------------------
+    # Comma-separated explicit origins, e.g. "https://cdp-admin.example.com,http://localhost:3000".
+    # The bundled UI is served same-origin and needs no entry here.
+    CORS_ALLOW_ORIGINS: str = Field(default="http://localhost:8000,http://127.0.0.1:8000")
+    # Optional regex for dynamic origins, e.g. r"https://.*\.example\.com"
+    CORS_ALLOW_ORIGIN_REGEX: Optional[str] = None
+    CORS_ALLOW_CREDENTIALS: bool = Field(default=True)
+
+    # --------------------------------------------------------
+    # LLM Models
+    # --------------------------------------------------------
+    # Model ID is configurable to allow rapid switching without redeploy.
+    # Default chosen for low latency and cost.
+    GEMINI_MODEL_ID: str = Field(default="gemini-2.5-flash-lite")
+    # API key is intentionally not defaulted.
+    # Missing key should fail at runtime, not silently degrade.
+    GEMINI_API_KEY: Optional[str] = None
+    # Hugging Face access token
+    # Required when loading private models or avoiding rate limits
+    HUGGINGFACE_TOKEN: Optional[str] = None
+
+    # Optional FunctionGemma weight quantization: "none" (default), "int8" or "int4".
+    # int8 uses dynamic quantization on CPU and bitsandbytes on CUDA; int4 needs CUDA.
+    GEMMA_QUANTIZATION: str = Field(default="none")
+
+    # Concurrent FunctionGemma prompts are micro-batched into one forward pass.
+    # GEMMA_BATCH_MAX_SIZE=1 disables batching.
+    GEMMA_BATCH_MAX_SIZE: int = Field(default=8)
+    GEMMA_BATCH_MAX_WAIT_MS: float = Field(default=5.0)
+
+    # Skip the FunctionGemma routing call when a prompt contains no tool keyword
+    INTENT_PREFILTER_ENABLED: bool = Field(default=True)
+
+    # --------------------------------------------------------
+    # Redis / Celery / Sync
+    # --------------------------------------------------------
+    REDIS_URL: Optional[str] = Field(default="redis://localhost:6379/0")
+    CELERY_REDIS_URL: Optional[str] = Field(default="redis://localhost:6379/1")
+    CELERY_SYNC_PROFILES_CRON: Optional[str] = Field(default="*/5 * * * *")
+    DATA_SYNC_API_KEY: Optional[str] = None
+
+    # --------------------------------------------------------
+    # /chat Response Cache (exact + semantic)
+    # --------------------------------------------------------
+    SEMANTIC_CACHE_ENABLED: bool = Field(default=True)
+    SEMANTIC_CACHE_MODEL_ID: str = Field(default="sentence-transformers/all-MiniLM-L6-v2")
+    SEMANTIC_CACHE_TTL: int = Field(default=3600)
+    SEMANTIC_CACHE_THRESHOLD: float = Field(default=0.95)
+
+    # --------------------------------------------------------
+    # Weather tool geocoding cache (SQLite, survives restarts)
+    # --------------------------------------------------------
+    GEOCODE_CACHE_PATH: str = Field(default="~/.cache/leo-activation/geocode.sqlite3")  # "" = memory only
+    GEOCODE_CACHE_TTL: int = Field(default=30 * 86400)
+
+    # --------------------------------------------------------
+    # Email / SMTP / SendGrid / Brevo
+    # --------------------------------------------------------
+    EMAIL_PROVIDER: str = Field(default="smtp")  # Expected values: "smtp", "sendgrid", "brevo"
+    BREVO_API_KEY: Optional[str] = None
+    BREVO_FROM_EMAIL: Optional[str] = None
+    BREVO_FROM_NAME: Optional[str] = None
+    SENDGRID_API_KEY: Optional[str] = None
+    SENDGRID_FROM: Optional[str] = None
+    SMTP_HOST: str = Field(default="smtp.gmail.com")
+    SMTP_PORT: int = Field(default=587)
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    # Accepts common truthy values (1/true/yes/on) to reduce config friction
+    SMTP_USE_TLS: bool = Field(default=True)
+
+    # --------------------------------------------------------
+    # Zalo Official Account
+    # --------------------------------------------------------
+    ZALO_APP_ID: Optional[str] = None
+    ZALO_APP_SECRET: Optional[str] = None
+    ZALO_OA_API_URL: Optional[str] = None
+    ZALO_OA_TOKEN: Optional[str] = None
+    ZALO_ZNS_TEMPLATE_ID: Optional[str] = None
+    ZALO_OA_REFRESH_TOKEN: Optional[str] = None
+    ZALO_OA_MAX_RETRIES: int = Field(default=1)
+
+    # --------------------------------------------------------
+    # Facebook Page Messaging
+    # --------------------------------------------------------
+    FB_PAGE_ACCESS_TOKEN: Optional[str] = None
+    FB_PAGE_ID: Optional[str] = None
+
+    # --------------------------------------------------------
+    # Mobile Push Notifications
+    # --------------------------------------------------------
+    PUSH_PROVIDER: str = Field(default="firebase")
+    FCM_PROJECT_ID: Optional[str] = None
+    FCM_SERVICE_ACCOUNT_JSON: Optional[str] = None
+
+    class Config:
+        # .env is already loaded into os.environ above (with override=True),
+        # so settings only need to read the process environment.
+        case_sensitive = True
+        extra = "ignore"
+
+    @field_validator("LOG_LEVEL")
+    @classmethod
+    def _upper(cls, v: str) -> str:
+        return v.upper()
+
+    @field_validator("APP_ENV", "EMAIL_PROVIDER", "PUSH_PROVIDER", "GEMMA_QUANTIZATION")
+    @classmethod
+    def _lower(cls, v: str) -> str:
+        return v.lower()
+
+    @field_validator("ZALO_OA_MAX_RETRIES", mode="before")
+    @classmethod
+    def _lenient_retries(cls, v):
+        # Retries are non-critical: an invalid value falls back to 1
+        try:
+            return int(v)
+        except (TypeError, ValueError):
+            return 1
+
+    @field_validator("SMTP_USE_TLS", mode="before")
+    @classmethod
+    def _truthy_tls(cls, v):
+        # Accept common truthy values; anything else (including empty) is False
+        if isinstance(v, bool):
+            return v
+        return str(v).strip().lower() in ("1", "true", "yes")
+
+
+settings = AppSettings()
+
+
 # ============================================================
 # Logging Configuration
 # ============================================================
-# LOG_LEVEL is expected to be something like: DEBUG, INFO, WARNING, ERROR
-# Default to INFO if missing or invalid.
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVEL = settings.LOG_LEVEL
 
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL, logging.INFO),
@@ -30,49 +203,41 @@ logger = logging.getLogger(__name__)
 # ============================================================
 # Application Metadata
 # ============================================================
-# Network binding
-MAIN_APP_HOST: str = os.getenv("MAIN_APP_HOST", "0.0.0.0")
-
-# Port parsing should be strict: invalid values must fail fast
-try:
-    MAIN_APP_PORT: int = int(os.getenv("MAIN_APP_PORT", "8000"))
-except ValueError:
-    raise RuntimeError("MAIN_APP_PORT must be a valid integer")
-
-# Descriptive metadata (used by FastAPI / OpenAPI)
-MAIN_APP_TITLE: str = os.getenv("MAIN_APP_TITLE", "LEO Activation API")
-MAIN_APP_DESCRIPTION: str = os.getenv(
-    "MAIN_APP_DESCRIPTION",
-    "LEO Activation Chatbot for LEO CDP with Function Calling",
-)
-MAIN_APP_VERSION: str = os.getenv("MAIN_APP_VERSION", "1.0.0")
+# Module-level names are kept as typed aliases of `settings` so existing
+# `from main_configs import X` call sites keep working.
+MAIN_APP_HOST: str = settings.MAIN_APP_HOST
+MAIN_APP_PORT: int = settings.MAIN_APP_PORT
+APP_ENV: str = settings.APP_ENV
+MAIN_APP_WORKERS: int = settings.MAIN_APP_WORKERS
+MAIN_APP_TITLE: str = settings.MAIN_APP_TITLE
+MAIN_APP_DESCRIPTION: str = settings.MAIN_APP_DESCRIPTION
+MAIN_APP_VERSION: str = settings.MAIN_APP_VERSION
+AGENT_THREAD_POOL_SIZE: int = settings.AGENT_THREAD_POOL_SIZE
 
 
 # ============================================================
 # CORS Configuration
 # ============================================================
-# ⚠️ SECURITY NOTE
-# Using "*" with credentials=True is NOT allowed by browsers
-# and should never be used in production.
-# Replace "*" with explicit origins when deploying.
-CORS_ALLOW_ORIGINS = [
-    "*"  # e.g. "https://cdp-admin.example.com"
-]
-
-CORS_ALLOW_CREDENTIALS: bool = True
+# Origins are always explicit: "*" combined with credentials is rejected by
+# browsers and forces CORSMiddleware to echo the request Origin on every call.
+_cors_origins = [origin.strip() for origin in settings.CORS_ALLOW_ORIGINS.split(",") if origin.strip()]
+if "*" in _cors_origins:
+    logger.warning(
+        "CORS_ALLOW_ORIGINS contains '*', which is ignored: list origins explicitly "
+        "or set CORS_ALLOW_ORIGIN_REGEX to allow a pattern."
+    )
+CORS_ALLOW_ORIGINS: List[str] = [origin for origin in _cors_origins if origin != "*"]
+CORS_ALLOW_ORIGIN_REGEX: Optional[str] = settings.CORS_ALLOW_ORIGIN_REGEX or None
+
+CORS_ALLOW_CREDENTIALS: bool = settings.CORS_ALLOW_CREDENTIALS
 CORS_ALLOW_METHODS = ["*"]
 CORS_ALLOW_HEADERS = ["*"]
 
 # ============================================================
 # Gemini LLM Configuration
 # ============================================================
-# Model ID is configurable to allow rapid switching without redeploy.
-# Default chosen for low latency and cost.
-GEMINI_MODEL_ID: str = os.getenv("GEMINI_MODEL_ID", "gemini-2.5-flash-lite")
-
-# API key is intentionally not defaulted.
-# Missing key should fail at runtime, not silently degrade.
-GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL_ID: str = settings.GEMINI_MODEL_ID
+GEMINI_API_KEY: Optional[str] = settings.GEMINI_API_KEY
 
 
 # ============================================================
@@ -84,18 +249,46 @@ GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
 # - Best used only for tool routing / function selection
 GEMMA_FUNCTION_MODEL_ID: str = "google/functiongemma-270m-it"
 
+# Off by default: at 270M params, quantization error is noticeable.
+# Validate tool-call accuracy before enabling in production.
+GEMMA_QUANTIZATION: str = settings.GEMMA_QUANTIZATION
+
+# Micro-batching of concurrent /chat routing calls (see agentic_models/gemma_batcher.py)
+GEMMA_BATCH_MAX_SIZE: int = settings.GEMMA_BATCH_MAX_SIZE
+GEMMA_BATCH_MAX_WAIT_MS: float = settings.GEMMA_BATCH_MAX_WAIT_MS
+
+
+# Lexical pre-classifier in front of FunctionGemma (see agentic_models/router.py)
+INTENT_PREFILTER_ENABLED: bool = settings.INTENT_PREFILTER_ENABLED
+
 
 # Hugging Face access token
-# Required when loading private models or avoiding rate limits
-HUGGINGFACE_TOKEN: str = os.getenv("HUGGINGFACE_TOKEN")
+HUGGINGFACE_TOKEN: Optional[str] = settings.HUGGINGFACE_TOKEN
 
 # Default Redis Configuration for caching and state management
-REDIS_URL: Optional[str] = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-CELERY_REDIS_URL: Optional[str] = os.getenv("CELERY_REDIS_URL", "redis://localhost:6379/1")
-CELERY_SYNC_PROFILES_CRON: Optional[str] = os.getenv("CELERY_SYNC_PROFILES_CRON", "*/5 * * * *")
+REDIS_URL: Optional[str] = settings.REDIS_URL
+CELERY_REDIS_URL: Optional[str] = settings.CELERY_REDIS_URL
+CELERY_SYNC_PROFILES_CRON: Optional[str] = settings.CELERY_SYNC_PROFILES_CRON
+
+# ============================================================
+# /chat Response Cache (exact + semantic)
+# ============================================================
+# Skips the full Gemma -> tools -> Gemini pipeline for repeated prompts.
+SEMANTIC_CACHE_ENABLED: bool = settings.SEMANTIC_CACHE_ENABLED
+SEMANTIC_CACHE_MODEL_ID: str = settings.SEMANTIC_CACHE_MODEL_ID
+SEMANTIC_CACHE_TTL: int = settings.SEMANTIC_CACHE_TTL
+SEMANTIC_CACHE_THRESHOLD: float = settings.SEMANTIC_CACHE_THRESHOLD
+
+# ============================================================
+# Geocoding Cache (weather tool)
+# ============================================================
+# City -> coordinates never changes within a session; persisted on disk so
+# restarts and CLI one-shots skip the Open-Meteo geocoding fan-out.
+GEOCODE_CACHE_PATH: str = settings.GEOCODE_CACHE_PATH
+GEOCODE_CACHE_TTL: int = settings.GEOCODE_CACHE_TTL
 
 # Data Sync API Key for authenticating with LeoCDP
-DATA_SYNC_API_KEY: Optional[str] = os.getenv("DATA_SYNC_API_KEY")
+DATA_SYNC_API_KEY: Optional[str] = settings.DATA_SYNC_API_KEY
 
 # ============================================================
 # Marketing / Messaging Integrations Configuration
@@ -106,65 +299,53 @@ class MarketingConfigs:
 
     Design choice:
     - Use class attributes instead of instance attributes
-    - Read env vars once at import time
+    - Values come from the typed `settings` resolved once at import
     - Avoid scattering os.getenv() across business logic
     """
 
     # --------------------------------------------------------
     # Email / SMTP / SendGrid
     # --------------------------------------------------------
-    EMAIL_PROVIDER: str = os.getenv("EMAIL_PROVIDER", "smtp").lower()
-    # Expected values: "smtp", "sendgrid"
+    EMAIL_PROVIDER: str = settings.EMAIL_PROVIDER
 
     # -------- Brevo --------
-    BREVO_API_KEY: Optional[str] = os.getenv("BREVO_API_KEY")
-    BREVO_FROM_EMAIL: Optional[str] = os.getenv("BREVO_FROM_EMAIL")
-    BREVO_FROM_NAME: Optional[str] = os.getenv("BREVO_FROM_NAME")
+    BREVO_API_KEY: Optional[str] = settings.BREVO_API_KEY
+    BREVO_FROM_EMAIL: Optional[str] = settings.BREVO_FROM_EMAIL
+    BREVO_FROM_NAME: Optional[str] = settings.BREVO_FROM_NAME
 
     # -------- SendGrid --------
-    SENDGRID_API_KEY: Optional[str] = os.getenv("SENDGRID_API_KEY")
-    SENDGRID_FROM: Optional[str] = os.getenv("SENDGRID_FROM")
+    SENDGRID_API_KEY: Optional[str] = settings.SENDGRID_API_KEY
+    SENDGRID_FROM: Optional[str] = settings.SENDGRID_FROM
 
     # -------- SMTP --------
-    SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
-    try:
-        SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
-    except ValueError:
-        raise RuntimeError("SMTP_PORT must be a valid integer")
-    SMTP_USERNAME: Optional[str] = os.getenv("SMTP_USERNAME")
-    SMTP_PASSWORD: Optional[str] = os.getenv("SMTP_PASSWORD")
-    SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "1").lower() in (
-        "1",
-        "true",
-        "yes",
-    )  # Accept common truthy values to reduce config friction
+    SMTP_HOST: str = settings.SMTP_HOST
+    SMTP_PORT: int = settings.SMTP_PORT
+    SMTP_USERNAME: Optional[str] = settings.SMTP_USERNAME
+    SMTP_PASSWORD: Optional[str] = settings.SMTP_PASSWORD
+    SMTP_USE_TLS: bool = settings.SMTP_USE_TLS
 
     # --------------------------------------------------------
     # Zalo Official Account
     # --------------------------------------------------------
-    ZALO_APP_ID: Optional[str] = os.getenv("ZALO_APP_ID")
-    ZALO_APP_SECRET: Optional[str] = os.getenv("ZALO_APP_SECRET")
-    ZALO_OA_API_URL: Optional[str] = os.getenv("ZALO_OA_API_URL")
-    ZALO_OA_TOKEN: Optional[str] = os.getenv("ZALO_OA_TOKEN")
-    ZALO_ZNS_TEMPLATE_ID: Optional[str] = os.getenv("ZALO_ZNS_TEMPLATE_ID")
-    ZALO_OA_REFRESH_TOKEN: Optional[str] = os.getenv("ZALO_OA_REFRESH_TOKEN")
-
-    try:
-        ZALO_OA_MAX_RETRIES: int = int(os.getenv("ZALO_OA_MAX_RETRIES", "1"))
-    except ValueError:
-        ZALO_OA_MAX_RETRIES = 1
+    ZALO_APP_ID: Optional[str] = settings.ZALO_APP_ID
+    ZALO_APP_SECRET: Optional[str] = settings.ZALO_APP_SECRET
+    ZALO_OA_API_URL: Optional[str] = settings.ZALO_OA_API_URL
+    ZALO_OA_TOKEN: Optional[str] = settings.ZALO_OA_TOKEN
+    ZALO_ZNS_TEMPLATE_ID: Optional[str] = settings.ZALO_ZNS_TEMPLATE_ID
+    ZALO_OA_REFRESH_TOKEN: Optional[str] = settings.ZALO_OA_REFRESH_TOKEN
+    ZALO_OA_MAX_RETRIES: int = settings.ZALO_OA_MAX_RETRIES
 
     # --------------------------------------------------------
     # Facebook Page Messaging
     # --------------------------------------------------------
-    FB_PAGE_ACCESS_TOKEN: Optional[str] = os.getenv("FB_PAGE_ACCESS_TOKEN")
-    FB_PAGE_ID: Optional[str] = os.getenv("FB_PAGE_ID")
+    FB_PAGE_ACCESS_TOKEN: Optional[str] = settings.FB_PAGE_ACCESS_TOKEN
+    FB_PAGE_ID: Optional[str] = settings.FB_PAGE_ID
 
     # --------------------------------------------------------
     # Mobile Push Notifications
     # --------------------------------------------------------
-    PUSH_PROVIDER: str = os.getenv("PUSH_PROVIDER", "firebase").lower()
+    PUSH_PROVIDER: str = settings.PUSH_PROVIDER
 
     # Firebase Cloud Messaging (FCM)
-    FCM_PROJECT_ID: Optional[str] = os.getenv("FCM_PROJECT_ID")
-    FCM_SERVICE_ACCOUNT_JSON: Optional[str] = os.getenv("FCM_SERVICE_ACCOUNT_JSON")
+    FCM_PROJECT_ID: Optional[str] = settings.FCM_PROJECT_ID
+    FCM_SERVICE_ACCOUNT_JSON: Optional[str] = settings.FCM_SERVICE_ACCOUNT_JSON
@@ -23,6 +23,8 @@ exec uvicorn main:app \
   --host "$MAIN_APP_HOST" \
   --port "$MAIN_APP_PORT" \
   --workers "$WORKERS" \
+  --loop uvloop \
+  --http httptools \
   --log-level info \
   --proxy-headers \
   --forwarded-allow-ips="*"
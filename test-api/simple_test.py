@@ -1,6 +1,8 @@
+import json
+
 import requests
 
-URL = "http://localhost:8000/chat"
+URL = "http://localhost:8000/chat/stream"
 
 test_prompts = [
     "What time is it and what is the weather in Ho Chi Minh City?",
@@ -10,10 +12,22 @@ test_prompts = [
 
 for prompt in test_prompts:
     print(f"\n--- Testing Prompt: {prompt} ---")
-    response = requests.post(URL, json={"prompt": prompt})
-    if response.status_code == 200:
-        data = response.json()
-        print(f"Assistant: {data['answer']}")
-        print(f"Debug Info: {data.get('debug', 'No debug data available')}")
-    else:
-        print(f"Error: {response.text}")
\ No newline at end of file
+    with requests.post(URL, json={"prompt": prompt}, stream=True) as response:
+        if response.status_code != 200:
+            print(f"Error: {response.text}")
+            continue
+
+        print("Assistant: ", end="", flush=True)
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+
+            event = json.loads(line[len("data: "):])
+            if event["type"] == "tool":
+                print(f"[tool done: {event['name']}] ", end="", flush=True)
+            elif event["type"] == "token":
+                print(event["text"], end="", flush=True)
+            elif event["type"] == "final":
+                print(f"\nDebug Info: {event.get('debug', 'No debug data available')}")
+            elif event["type"] == "error":
+                print(f"\nError: {event['detail']}")
@@ -73,3 +73,34 @@ def test_chat_response_schema_when_success(client: TestClient):
 def test_chat_validation_error(client: TestClient):
     response = client.post("/chat", json={})
     assert response.status_code == 422
+
+
+# ============================================================
+# Router Factory Hook
+# ============================================================
+class DummyRouter:
+    def __init__(self):
+        self.registered = None
+
+    def register_tools(self, tools, tools_map):
+        self.registered = (tools, tools_map)
+
+    async def ahandle_message(self, messages, tools=None, tools_map=None):
+        return {"answer": "dummy answer", "debug": {"calls": [], "data": []}}
+
+
+def test_router_factory_injects_router_without_model_loading():
+    dummy = DummyRouter()
+    app = create_app(router_factory=lambda: dummy)
+
+    # Nothing is built until startup
+    assert app.state.agent_router is None
+
+    with TestClient(app) as test_client:
+        assert app.state.agent_router is dummy
+        assert dummy.registered is not None
+
+        response = test_client.post("/chat", json={"prompt": "Hello agent"})
+
+    assert response.status_code == 200
+    assert response.json()["answer"] == "dummy answer"
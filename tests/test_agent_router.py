@@ -5,6 +5,7 @@ import types
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from agentic_models.function_gemma import FunctionGemmaEngine
 from agentic_models.router import AgentRouter
 
 
@@ -121,3 +122,148 @@ def test_gemini_returns_empty_fallback(monkeypatch):
     assert len(res["answer"]) > 0
     assert res["debug"]["calls"]
     assert res["debug"]["data"][0]["response"]["status"] == "success"
+
+
+def test_ahandle_message_runs_tools_concurrently_and_keeps_order():
+    import asyncio
+    import threading
+
+    router = AgentRouter(mode="auto")
+
+    class MultiCallGemma(DummyGemma):
+        def generate(self, messages, tools=None):
+            return "<start_function_call>call:slow_a{}<end_function_call><start_function_call>call:slow_b{}<end_function_call>"
+
+        def extract_tool_calls(self, text: str):
+            return [{"name": "slow_a", "arguments": {}}, {"name": "slow_b", "arguments": {}}]
+
+    router.gemma = MultiCallGemma()
+    router.gemini = DummyGemini()
+
+    # Both tools block until the other has started: only passes if they overlap
+    barrier = threading.Barrier(2, timeout=5)
+
+    def slow_a():
+        barrier.wait()
+        return {"tool": "a"}
+
+    def slow_b():
+        barrier.wait()
+        return {"tool": "b"}
+
+    messages = [{"role": "user", "content": "run both"}]
+    res = asyncio.run(
+        router.ahandle_message(messages, tools=[], tools_map={"slow_a": slow_a, "slow_b": slow_b})
+    )
+
+    assert res["answer"] == "Final synthesized reply"
+    assert [c["name"] for c in res["debug"]["calls"]] == ["slow_a", "slow_b"]
+    assert json.loads(res["debug"]["data"][0]["response"]) == {"tool": "a"}
+    assert json.loads(res["debug"]["data"][1]["response"]) == {"tool": "b"}
+
+
+class DummyStreamingGemini(DummyGemini):
+    def generate_stream(self, messages, tools=None):
+        self.last_messages = messages
+        yield "Final "
+        yield "synthesized reply"
+
+
+def test_handle_message_streaming_yields_tokens_then_final():
+    router = AgentRouter(mode="auto")
+    router.gemma = DummyGemma()
+    router.gemini = DummyStreamingGemini()
+
+    def fake_get_current_weather(location, unit="celsius"):
+        return {"status": "success", "location": location}
+
+    messages = [{"role": "user", "content": "What is the weather in Ho Chi Minh City today?"}]
+
+    events = list(router.handle_message_streaming(
+        messages, tools=[], tools_map={"get_current_weather": fake_get_current_weather}
+    ))
+
+    assert events[0] == {"type": "tool", "name": "get_current_weather"}
+    assert [e["text"] for e in events if e["type"] == "token"] == ["Final ", "synthesized reply"]
+    final = events[-1]
+    assert final["type"] == "final"
+    assert final["answer"] == "Final synthesized reply"
+    assert final["debug"]["calls"][0]["name"] == "get_current_weather"
+    # Tool output was fed into the Gemini prompt
+    assert any(m["role"] == "tool" for m in router.gemini.last_messages)
+
+
+def test_prefilter_skips_gemma_for_prompts_without_tool_keywords():
+    from agentic_models.router import build_tool_intent_pattern
+
+    router = AgentRouter(mode="auto")
+
+    class CountingGemma(DummyGemma):
+        calls = 0
+
+        def generate(self, messages, tools=None):
+            CountingGemma.calls += 1
+            return super().generate(messages, tools)
+
+    router.gemma = CountingGemma()
+    router.gemini = DummyGemini()
+
+    def get_current_weather(location, unit="celsius"):
+        return {"status": "success", "location": location}
+
+    # Registered tool set (schemas are irrelevant to the dummy engines)
+    router.tools = (get_current_weather,)
+    router.tools_map = {"get_current_weather": get_current_weather}
+    router.tool_intent_pattern = build_tool_intent_pattern(router.tools)
+
+    res = router.handle_message([{"role": "user", "content": "Give me a summary"}])
+    assert res["answer"] == "Final synthesized reply"
+    assert CountingGemma.calls == 0
+
+    res = router.handle_message([{"role": "user", "content": "Thời tiết ở Ho Chi Minh City?"}])
+    assert CountingGemma.calls == 1
+    assert res["debug"]["calls"][0]["name"] == "get_current_weather"
+
+    # Unaccented Vietnamese still routes through Gemma
+    router.handle_message([{"role": "user", "content": "thoi tiet o sai gon"}])
+    assert CountingGemma.calls == 2
+
+    router.handle_message([{"role": "user", "content": "gui tin nhan cho khach hang"}])
+    assert CountingGemma.calls == 3
+
+
+def test_bulk_weather_call_is_parsed_into_a_location_list(monkeypatch):
+    from agentic_tools import weather_tools as wt
+
+    class BulkGemma:
+        # Real FunctionGemma output parser, no model weights
+        extract_tool_calls = FunctionGemmaEngine.extract_tool_calls
+        _parse_list = FunctionGemmaEngine._parse_list
+        _cast_value = FunctionGemmaEngine._cast_value
+
+        def generate(self, messages, tools=None):
+            return (
+                "<start_function_call>call:get_current_weather_bulk{"
+                "locations:[<escape>Hanoi<escape>,<escape>Da Nang<escape>],unit:<escape>celsius<escape>"
+                "}<end_function_call>"
+            )
+
+    router = AgentRouter(mode="auto")
+    router.gemma = BulkGemma()
+    router.gemini = DummyGemini()
+
+    looked_up = []
+
+    def fake_weather(location, unit="celsius"):
+        looked_up.append(location)
+        return {"status": "success", "location": {"input": location}}
+
+    monkeypatch.setattr(wt, "get_current_weather", fake_weather)
+
+    messages = [{"role": "user", "content": "Compare the weather in Hanoi and Da Nang"}]
+    res = router.handle_message(
+        messages, tools=[], tools_map={"get_current_weather_bulk": wt.get_current_weather_bulk}
+    )
+
+    assert res["debug"]["calls"][0]["arguments"]["locations"] == ["Hanoi", "Da Nang"]
+    assert sorted(looked_up) == ["Da Nang", "Hanoi"]
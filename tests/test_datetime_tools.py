@@ -0,0 +1,38 @@
+import os
+import sys
+from datetime import datetime
+
+# Ensure project root is on path
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)
+
+from agentic_tools import datetime_tools as dt
+
+
+def test_get_date_default_tracks_current_day(monkeypatch):
+    # The default must be resolved per call, not frozen at import time
+    day_one = datetime(2030, 1, 1, 23, 59, 59).timestamp()
+    day_two = datetime(2030, 1, 2, 0, 0, 1).timestamp()
+
+    monkeypatch.setattr(dt.time, "time", lambda: day_one)
+    assert dt.get_date()["resolved_date"] == "2030-01-01"
+
+    monkeypatch.setattr(dt.time, "time", lambda: day_two)
+    res = dt.get_date()
+    assert res["resolved_date"] == "2030-01-02"
+    assert res["current_date"] == "2030-01-02"
+    assert res["timestamp"] == "2030-01-02 00:00:01"
+
+
+def test_get_date_explicit_input_and_cache_isolation(monkeypatch):
+    now = datetime(2030, 6, 1, 12, 0, 0).timestamp()
+    monkeypatch.setattr(dt.time, "time", lambda: now)
+
+    assert dt.get_date("2023-12-25")["resolved_date"] == "2023-12-25"
+    # Same second, different input → not served from the previous payload
+    assert dt.get_date()["resolved_date"] == "2030-06-01"
+
+    # Returned dicts are copies: mutating one does not leak into the cache
+    dt.get_date()["resolved_date"] = "tampered"
+    assert dt.get_date()["resolved_date"] == "2030-06-01"
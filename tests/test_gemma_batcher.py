@@ -0,0 +1,44 @@
+import os
+import sys
+import threading
+
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agentic_models.gemma_batcher import GemmaBatcher
+
+
+class FakeModel:
+    """Appends each row's unpadded prompt length as the single 'generated' token."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def generate(self, input_ids, attention_mask, pad_token_id, **kwargs):
+        self.batch_sizes.append(input_ids.shape[0])
+        new_tokens = attention_mask.sum(dim=1, keepdim=True).to(input_ids.dtype)
+        return torch.cat([input_ids, new_tokens], dim=1)
+
+
+def test_concurrent_submissions_share_one_left_padded_batch():
+    model = FakeModel()
+    batcher = GemmaBatcher(model, pad_token_id=0, generate_kwargs={}, max_batch_size=8, max_wait_ms=300)
+
+    prompts = [torch.tensor([[5, 6, 7]]), torch.tensor([[8]]), torch.tensor([[9, 10]])]
+    results = [None] * len(prompts)
+    start = threading.Barrier(len(prompts))
+
+    def worker(i):
+        start.wait()
+        results[i] = batcher.submit(prompts[i]).tolist()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(prompts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert model.batch_sizes == [3]
+    # Each caller gets only its own generated tokens back
+    assert results == [[3], [1], [2]]
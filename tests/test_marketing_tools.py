@@ -19,6 +19,16 @@ class DummyChannel(mt.NotificationChannel):
         return {"status": "success", "channel": "dummy", "recipient": recipient_segment, "message": message}
 
 
+@pytest.fixture(autouse=True)
+def fresh_channel_instances():
+    # Channels are cached singletons; rebuild them so per-test config applies
+    mt.ActivationManager._instances.clear()
+    mt.ActivationManager._dispatch.clear()
+    yield
+    mt.ActivationManager._instances.clear()
+    mt.ActivationManager._dispatch.clear()
+
+
 def test_activate_channel_input_validation():
     # invalid channel
     res = mt.activate_channel("", "seg", "msg")
@@ -528,3 +538,140 @@ def test_email_brevo_empty_recipients(monkeypatch):
     assert res["status"] == "error"
     assert res["provider"] == "brevo"
     assert res["message"] == "Recipient list is empty"
+
+
+def test_pooled_requests_reuses_session_and_proxies_module():
+    from agentic_tools.http_client import PooledRequests
+
+    class FakeSession:
+        def __init__(self):
+            self.urls = []
+
+        def post(self, url, **kwargs):
+            self.urls.append(url)
+            return {"ok": True}
+
+    session = FakeSession()
+    pooled = PooledRequests(session)
+
+    assert pooled.post("https://a.example") == {"ok": True}
+    assert pooled.post("https://b.example") == {"ok": True}
+    assert session.urls == ["https://a.example", "https://b.example"]
+    # Non-HTTP attributes fall through to the real module
+    assert pooled.exceptions.RequestException is requests.exceptions.RequestException
+
+
+def test_smtp_pool_reuses_one_authenticated_connection(monkeypatch):
+    from email.message import EmailMessage
+    from agentic_tools.channels.email import SMTPPool
+
+    state = {"connects": 0, "logins": 0, "sent": 0}
+
+    class FakeSMTP:
+        def __init__(self, host, port, timeout=None):
+            state["connects"] += 1
+
+        def ehlo(self):
+            pass
+
+        def starttls(self, context=None):
+            pass
+
+        def login(self, username, password):
+            state["logins"] += 1
+
+        def send_message(self, msg):
+            state["sent"] += 1
+
+    monkeypatch.setattr("agentic_tools.channels.email.smtplib.SMTP", FakeSMTP)
+
+    pool = SMTPPool(max_messages=2)
+    for _ in range(3):
+        pool.send_message(EmailMessage(), "smtp.fake", 587, "me@example.com", "secret")
+
+    assert state["sent"] == 3
+    # Third message exceeds max_messages=2 and recycles the connection
+    assert state["connects"] == 2
+    assert state["logins"] == 2
+
+
+def test_zalo_backoff_retries_transient_errors_only(monkeypatch):
+    from agentic_tools.channels import zalo
+
+    sleeps = []
+    monkeypatch.setattr(zalo.time, "sleep", lambda s: sleeps.append(s))
+
+    class Resp:
+        def __init__(self, status_code, headers=None):
+            self.status_code = status_code
+            self.headers = headers or {}
+
+    responses = [Resp(503), Resp(429, {"Retry-After": "2"}), Resp(200)]
+
+    def fake_post(url, json=None, headers=None, timeout=None):
+        return responses.pop(0)
+
+    monkeypatch.setattr("agentic_tools.channels.zalo.requests.post", fake_post)
+
+    channel = zalo.ZaloOAChannel(override_token="fake-token", max_retries=3)
+    resp = channel._post_with_backoff({}, {})
+
+    assert resp.status_code == 200
+    assert len(sleeps) == 2
+    assert zalo.RETRY_BASE_DELAY * 0.5 <= sleeps[0] < zalo.RETRY_BASE_DELAY * 1.5
+    assert sleeps[1] == 2.0  # Retry-After honored
+
+    # 4xx is returned immediately without retrying
+    responses[:] = [Resp(400), Resp(200)]
+    sleeps.clear()
+    assert channel._post_with_backoff({}, {}).status_code == 400
+    assert sleeps == []
+
+
+def test_activation_manager_reuses_channel_instance(monkeypatch):
+    created = {"n": 0}
+
+    class CountingChannel(mt.NotificationChannel):
+        def __init__(self):
+            created["n"] += 1
+
+        def send(self, recipient_segment: str, message: str, **kwargs):
+            return {"status": "success", "channel": "counting"}
+
+    # setitem first so monkeypatch removes "counting" from the registry on teardown
+    monkeypatch.setitem(mt.CHANNEL_REGISTRY, "counting", CountingChannel)
+    mt.ActivationManager.register_channel("counting", CountingChannel)
+    for _ in range(3):
+        assert mt.ActivationManager.execute("counting", "seg", "msg")["status"] == "success"
+    assert created["n"] == 1
+
+    # Re-registering swaps the class and drops the cached instance
+    mt.ActivationManager.register_channel("counting", CountingChannel)
+    mt.ActivationManager.execute("counting", "seg", "msg")
+    assert created["n"] == 2
+
+
+def test_zalo_send_fans_out_and_refreshes_token_once(monkeypatch):
+    from agentic_tools.channels import zalo
+
+    channel = zalo.ZaloOAChannel(override_token="old-token", max_retries=0)
+    refreshes = {"n": 0}
+
+    def fake_refresh():
+        refreshes["n"] += 1
+        channel.access_token = "new-token"
+        return True
+
+    def fake_call(payload):
+        if channel.access_token == "old-token":
+            return False, -124, "expired"
+        return True, 0, "msg"
+
+    monkeypatch.setattr(channel, "_refresh_access_token", fake_refresh)
+    monkeypatch.setattr(channel, "_execute_zns_call", fake_call)
+
+    recipients = [{"phone": f"09{i:08d}"} for i in range(20)] + [{"phone": ""}]
+    res = channel.send(recipient_segment="seg", message="hi", recipients=recipients)
+
+    assert res["stats"] == {"sent": 20, "failed": 0, "invalid_phone": 1}
+    assert refreshes["n"] == 1
@@ -10,16 +10,33 @@ PGVector-based Product Recommendation Demo
 """
 
 import asyncio
-import hashlib
-import json
 import logging
+import math
 import os
-from typing import List, Dict, Optional, Sequence
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Optional, Sequence, Tuple
 
 import numpy as np
 import asyncpg
+import orjson
+import torch
+import xxhash
 from sentence_transformers import SentenceTransformer
 
+try:
+    # Binary codec: vectors travel as packed float32 instead of text literals
+    from pgvector.asyncpg import register_vector
+except ImportError:  # pragma: no cover - falls back to "[...]" text literals
+    register_vector = None
+
+try:
+    # JIT-fused vector kernels
+    from numba import njit
+except ImportError:  # pragma: no cover - falls back to NumPy
+    njit = None
+
 # ============================================================
 # Logging
 # ============================================================
@@ -40,13 +57,55 @@ POOL_MIN_SIZE = 5
 POOL_MAX_SIZE = 20
 
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+EMBED_CACHE_SIZE = 65536
+# Max vector builds in flight; each one occupies a to_thread worker inside the encoder
+EMBED_CONCURRENCY = min(os.cpu_count() or 1, 4)
+
+
+def select_embed_device() -> str:
+    """CUDA → Apple MPS → CPU."""
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def load_vector_model(device: str):
+    """Loads the encoder on `device` (FP16 on CUDA), falling back to CPU if accelerator init fails."""
+    if device != "cpu":
+        try:
+            model = SentenceTransformer(MODEL_NAME, device=device)
+            if device == "cuda":
+                model.half()
+            return model, device
+        except Exception as e:
+            logger.warning("Embedding model init on %s failed, using CPU: %s", device, e)
+    return SentenceTransformer(MODEL_NAME, device="cpu"), "cpu"
+
 
 # Load embedding model ONCE (important for prod services)
-VECTOR_MODEL = SentenceTransformer(MODEL_NAME)
+VECTOR_MODEL, EMBED_DEVICE = load_vector_model(select_embed_device())
+EMBED_BATCH_SIZE = 64 if EMBED_DEVICE == "cpu" else 128
 VECTOR_DIM = VECTOR_MODEL.get_sentence_embedding_dimension()
 
 PROFILE_VECTOR_SIZE = VECTOR_DIM
-PRODUCT_VECTOR_SIZE = VECTOR_DIM * 3
+
+# Products are stored as three VECTOR_DIM segments; score = weighted cosine sum
+PRODUCT_SEGMENTS = ("name_emb", "cat_emb", "kw_emb")
+PRODUCT_SEGMENT_WEIGHTS = (0.34, 0.33, 0.33)
+
+# Embeddings are stored as FP16 `halfvec` (pgvector >= 0.7): half the bytes per
+# row and per distance computation; clients still send FP32, Postgres down-casts.
+VECTOR_TYPE = "halfvec"
+VECTOR_OPCLASS = "halfvec_cosine_ops"
+
+# HNSW ANN index (pgvector). `halfvec` HNSW indexes support at most 4000 dims.
+HNSW_MAX_DIM = 4000
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+HNSW_EF_SEARCH = 40
 
 # ============================================================
 # Utility Functions
@@ -56,57 +115,240 @@ def pgvector_to_numpy(v) -> Optional[np.ndarray]:
     """
     Convert pgvector output to numpy array.
     asyncpg may return:
+      - np.ndarray / HalfVector (register_vector binary codec)
+      - bytes in pgvector binary format (halfvec: float2, vector: float4)
       - list[float]
-      - string "[0.1,0.2,...]"
+      - string "[0.1,0.2,...]" (text-protocol fallback)
       - None
     """
     if v is None:
         return None
 
+    if isinstance(v, np.ndarray):
+        # Binary codec (register_vector) already decoded it
+        return v.astype(np.float32, copy=False)
+
+    if hasattr(v, "to_numpy"):
+        # pgvector HalfVector / Vector objects from the binary codec
+        return np.asarray(v.to_numpy(), dtype=np.float32)
+
+    if isinstance(v, (bytes, bytearray, memoryview)):
+        # pgvector wire format: uint16 dim, uint16 unused, then big-endian
+        # float2s for halfvec / float4s for vector
+        wire_dtype = ">f2" if VECTOR_TYPE == "halfvec" else ">f4"
+        return np.frombuffer(v, dtype=wire_dtype, offset=4).astype(np.float32)
+
     if isinstance(v, list):
         return np.asarray(v, dtype=np.float32)
 
     if isinstance(v, str):
-        return np.fromstring(v.strip("[]"), sep=",", dtype=np.float32)
+        return np.asarray(v.strip("[]").split(","), dtype=np.float32)
 
     raise TypeError(f"Unsupported pgvector type: {type(v)}")
 
 
+POINT_ID_MASK = (1 << 53) - 1  # fits BIGINT and stays exact as a JS/JSON number
+
+
+@lru_cache(maxsize=65536)
 def string_to_point_id(text: str) -> int:
     """
     Deterministic numeric ID from string.
     Allows stable IDs without DB sequences.
     """
-    return int(hashlib.sha256(text.encode()).hexdigest(), 16) % (10**16)
+    # Required, not optional: every writer must derive the same ID for a key
+    return xxhash.xxh3_64_intdigest(text) & POINT_ID_MASK
+
+
+# Text → embedding LRU shared by embed_text / embed_texts.
+# Marketing keywords repeat heavily across items, so encoder work drops to
+# the number of unique strings. Cached arrays are read-only.
+_EMBED_CACHE: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_EMBED_CACHE_LOCK = threading.Lock()
+
+# Shared read-only embedding for empty text
+_ZERO = np.zeros(VECTOR_DIM, dtype=np.float32)
+_ZERO.setflags(write=False)
+
+
+def _cache_get(text: str) -> Optional[np.ndarray]:
+    with _EMBED_CACHE_LOCK:
+        v = _EMBED_CACHE.get(text)
+        if v is not None:
+            _EMBED_CACHE.move_to_end(text)
+        return v
+
+
+def _cache_put(text: str, v: np.ndarray) -> None:
+    v.setflags(write=False)
+    with _EMBED_CACHE_LOCK:
+        _EMBED_CACHE[text] = v
+        _EMBED_CACHE.move_to_end(text)
+        if len(_EMBED_CACHE) > EMBED_CACHE_SIZE:
+            _EMBED_CACHE.popitem(last=False)
 
 
 def embed_text(text: str) -> np.ndarray:
     """
-    Safe text → vector embedding.
+    Safe text → vector embedding (cached, read-only).
     Empty input returns zero vector.
     """
     if not text:
-        return np.zeros(VECTOR_DIM, dtype=np.float32)
-    return np.asarray(
-        VECTOR_MODEL.encode(text, convert_to_tensor=False),
-        dtype=np.float32
-    )
+        return _ZERO
+    return embed_texts([text])[0]
 
 
-def normalize(v: np.ndarray) -> np.ndarray:
-    """L2-normalize vector for cosine similarity."""
-    n = np.linalg.norm(v)
-    return (v / n).astype(np.float32) if n > 0 else v
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """
+    Batched text → vectors: one encoder call for all cache misses.
+    Returns a (len(texts), VECTOR_DIM) float32 matrix of L2-normalized rows;
+    empty strings map to zero rows.
+    """
+    out = np.zeros((len(texts), VECTOR_DIM), dtype=np.float32)
+
+    misses: Dict[str, List[int]] = {}
+    for i, t in enumerate(texts):
+        if not t:
+            continue
+        cached = _cache_get(t)
+        if cached is not None:
+            out[i] = cached
+        else:
+            misses.setdefault(t, []).append(i)
+
+    if misses:
+        unique = list(misses)
+        encoded = VECTOR_MODEL.encode(
+            unique,
+            batch_size=EMBED_BATCH_SIZE,
+            device=EMBED_DEVICE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype(np.float32, copy=False)
+        for t, row in zip(unique, encoded):
+            out[misses[t]] = row
+            _cache_put(t, row.copy())
+
+    return out
 
 
 def vec_to_pg(v: np.ndarray) -> str:
-    """Convert numpy vector → pgvector literal."""
-    return "[" + ",".join(map(str, v.tolist())) + "]"
+    """Convert numpy vector → pgvector literal (text-protocol fallback only)."""
+    # Vectorized C-level formatting; %.7g round-trips float32 closely enough
+    return "[" + ",".join(np.char.mod("%.7g", np.asarray(v, dtype=np.float32)).tolist()) + "]"
+
+
+def vec_param(v: Optional[np.ndarray]):
+    """Query parameter for a vector column: raw ndarray with the binary codec, else a text literal."""
+    if v is None:
+        return None
+    if register_vector is not None:
+        return np.asarray(v, dtype=np.float32)
+    return vec_to_pg(v)
+
+
+def _encode_jsonb(v) -> bytes:
+    # jsonb binary format = version byte 1 + UTF-8 JSON text
+    return b"\x01" + (v if isinstance(v, bytes) else orjson.dumps(v))
+
+
+def _decode_jsonb(data: bytes):
+    return orjson.loads(data[1:])
+
+
+async def init_connection(conn: asyncpg.Connection):
+    """
+    Pool `init` hook, run on every new connection:
+    - binary jsonb codec that takes pre-serialized orjson bytes as-is
+    - pgvector binary codec (when pgvector is installed)
+    """
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
+    if register_vector is None:
+        return
+    # The codec looks up the `vector` type, so the extension must exist first
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+    await register_vector(conn)
+
+
+async def gather_bounded(aws, limit: int = EMBED_CONCURRENCY) -> list:
+    """asyncio.gather with at most `limit` awaitables running at once (order preserved)."""
+    sem = asyncio.Semaphore(limit)
+
+    async def _one(aw):
+        async with sem:
+            return await aw
+
+    return await asyncio.gather(*[_one(aw) for aw in aws])
 
 # ============================================================
 # Vector Builders (Async-safe)
 # ============================================================
 
+def _weighted_sum_normalize_np(rows: np.ndarray, weights: np.ndarray, out: np.ndarray) -> None:
+    np.dot(weights, rows, out=out)
+    out /= max(np.linalg.norm(out), 1e-12)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _weighted_sum_normalize(rows, weights, out):
+        # One pass writes the weighted row sum and accumulates its squared norm,
+        # a second scales in place: no temporaries between the two.
+        n, d = rows.shape
+        sq = 0.0
+        for j in range(d):
+            acc = 0.0
+            for i in range(n):
+                acc += weights[i] * rows[i, j]
+            out[j] = acc
+            sq += acc * acc
+        inv = 1.0 / math.sqrt(sq) if sq > 0.0 else 0.0
+        for j in range(d):
+            out[j] *= inv
+else:
+    _weighted_sum_normalize = _weighted_sum_normalize_np
+
+
+def _profile_from_rows(emb: np.ndarray, n_views: int, n_purchases: int) -> np.ndarray:
+    """Weighted group means of pre-encoded rows [views | purchases | interests], L2-normalized."""
+    n_interests = len(emb) - n_views - n_purchases
+
+    # Group mean weights folded into per-row weights → one fused kernel call
+    weights = np.empty(len(emb), dtype=np.float32)
+    offset = 0
+    for size, weight in ((n_views, 0.3), (n_purchases, 0.4), (n_interests, 0.3)):
+        if size:
+            weights[offset:offset + size] = weight / size
+        offset += size
+
+    out = np.empty(VECTOR_DIM, dtype=np.float32)
+    _weighted_sum_normalize(emb, weights, out)
+    return out
+
+
+def _product_from_rows(emb: np.ndarray) -> np.ndarray:
+    """
+    (3, dim) segments from pre-encoded rows [name, category, *keywords].
+    Encoder rows are already unit-norm; only the keyword mean needs rescaling.
+    """
+    out = np.empty((3, VECTOR_DIM), dtype=np.float32)
+    out[:2] = emb[:2]
+    n_keywords = len(emb) - 2
+    if n_keywords:
+        weights = np.full(n_keywords, 1.0 / n_keywords, dtype=np.float32)
+        _weighted_sum_normalize(np.ascontiguousarray(emb[2:]), weights, out[2])
+    else:
+        out[2] = 0.0
+    return out
+
+
 async def build_profile_vector(
     page_views: List[str],
     purchases: List[str],
@@ -121,12 +363,9 @@ async def build_profile_vector(
         return None
 
     def _compute():
-        pv = np.mean([embed_text(x) for x in page_views], axis=0) if page_views else 0
-        pu = np.mean([embed_text(x) for x in purchases], axis=0) if purchases else 0
-        it = np.mean([embed_text(x) for x in interests], axis=0) if interests else 0
-
-        combined = 0.3 * pv + 0.4 * pu + 0.3 * it
-        return normalize(combined)
+        # One batched encode for all three signal groups, then slice by offset
+        emb = embed_texts([*page_views, *purchases, *interests])
+        return _profile_from_rows(emb, len(page_views), len(purchases))
 
     return await asyncio.to_thread(_compute)
 
@@ -137,17 +376,53 @@ async def build_product_vector(
     keywords: List[str],
 ) -> np.ndarray:
     """
-    Product vector = [name | category | keyword-mean]
+    Product segments = rows (name, category, keyword-mean) of one (3, dim) buffer,
+    each L2-normalized.
     """
 
     def _compute():
-        name_v = embed_text(name)
-        cat_v = embed_text(category)
-        kw_v = (
-            np.mean([embed_text(k) for k in keywords], axis=0)
-            if keywords else np.zeros(VECTOR_DIM)
-        )
-        return normalize(np.concatenate([name_v, cat_v, kw_v]))
+        # Rows: [name, category, *keywords] in a single encoder batch
+        return _product_from_rows(embed_texts([name, category, *keywords]))
+
+    return await asyncio.to_thread(_compute)
+
+
+async def bulk_build(
+    profiles: Sequence[Dict],
+    products: Sequence[Dict],
+) -> Tuple[List[Optional[np.ndarray]], List[np.ndarray]]:
+    """
+    Seed-time builder: every profile and product text goes through ONE encoder
+    super-batch, then rows are sliced back per item by offset.
+
+    Returns:
+        (profile_vectors, product_vectors) aligned with the inputs.
+    """
+
+    def _compute():
+        texts: List[str] = []
+        spans = []
+        for p in profiles:
+            group = [*p["page_view_keywords"], *p["purchase_keywords"], *p["interest_keywords"]]
+            spans.append((len(texts), len(texts) + len(group)))
+            texts.extend(group)
+        for p in products:
+            group = [p["name"], p["category"], *p["keywords"]]
+            spans.append((len(texts), len(texts) + len(group)))
+            texts.extend(group)
+
+        emb = embed_texts(texts)
+
+        profile_vectors = [
+            _profile_from_rows(emb[lo:hi], len(p["page_view_keywords"]), len(p["purchase_keywords"]))
+            if hi > lo else None
+            for p, (lo, hi) in zip(profiles, spans)
+        ]
+        product_vectors = [
+            _product_from_rows(emb[lo:hi])
+            for lo, hi in spans[len(profiles):]
+        ]
+        return profile_vectors, product_vectors
 
     return await asyncio.to_thread(_compute)
 
@@ -163,82 +438,217 @@ async def ensure_schema(pool: asyncpg.Pool):
             CREATE TABLE IF NOT EXISTS profiles (
                 id BIGINT PRIMARY KEY,
                 profile_id TEXT UNIQUE,
-                embedding VECTOR({PROFILE_VECTOR_SIZE}),
+                embedding {VECTOR_TYPE}({PROFILE_VECTOR_SIZE}),
                 payload JSONB
             );
 
             CREATE TABLE IF NOT EXISTS products (
                 id BIGINT PRIMARY KEY,
                 product_id TEXT UNIQUE,
-                embedding VECTOR({PRODUCT_VECTOR_SIZE}),
+                name_emb {VECTOR_TYPE}({VECTOR_DIM}),
+                cat_emb {VECTOR_TYPE}({VECTOR_DIM}),
+                kw_emb {VECTOR_TYPE}({VECTOR_DIM}),
                 name TEXT,
                 category TEXT,
                 additional_info JSONB
             );
         """)
 
+        await ensure_vector_column(conn, "profiles", "embedding", PROFILE_VECTOR_SIZE)
+
+        # Tables created with the old single 3x-concat column get the segments added
+        for column in PRODUCT_SEGMENTS:
+            await ensure_vector_column(conn, "products", column, VECTOR_DIM)
+            await ensure_hnsw_index(conn, "products", column, VECTOR_DIM)
+
         logger.info("DB schema ready.")
 
+
+async def ensure_vector_column(conn: asyncpg.Connection, table: str, column: str, dim: int):
+    """
+    Adds `table.column` as VECTOR_TYPE(dim), migrating an existing column whose
+    type or dim differs (its HNSW index is dropped and rebuilt afterwards).
+    """
+    expected = f"{VECTOR_TYPE}({dim})"
+    current = await conn.fetchval(
+        """
+        SELECT format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = to_regclass($1) AND attname = $2 AND NOT attisdropped
+        """,
+        table,
+        column,
+    )
+
+    if current is None:
+        await conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {expected};")
+        return
+    if current == expected:
+        return
+
+    logger.info("Migrating %s.%s: %s -> %s", table, column, current, expected)
+    await conn.execute(f"DROP INDEX IF EXISTS {table}_{column}_hnsw;")
+    if current.endswith(f"({dim})"):
+        # Same width, FP32 -> FP16: cast in place
+        await conn.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {expected} USING {column}::{expected};"
+        )
+    else:
+        # Width changed: old embeddings are unusable, they are rewritten by the next upsert
+        await conn.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {expected} USING NULL;"
+        )
+
+
+async def ensure_hnsw_index(
+    conn: asyncpg.Connection,
+    table: str,
+    column: str,
+    dim: int,
+    opclass: str = VECTOR_OPCLASS,
+):
+    """
+    Cosine HNSW index on `table.column` (rebuilt by ensure_vector_column on type change).
+    Without it `ORDER BY embedding <=> $1` is an exact O(N·dim) scan.
+    """
+    index_name = f"{table}_{column}_hnsw"
+
+    if dim > HNSW_MAX_DIM:
+        logger.warning(
+            "Skipping %s: %d dims exceeds the HNSW limit (%d); queries fall back to exact scan.",
+            index_name, dim, HNSW_MAX_DIM,
+        )
+        return
+
+    await conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS {index_name}
+        ON {table} USING hnsw ({column} {opclass})
+        WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION});
+    """)
+
 # ============================================================
 # Upserts
 # ============================================================
 
+UPSERT_PROFILE_SQL = """
+    INSERT INTO profiles (id, profile_id, embedding, payload)
+    VALUES ($1, $2, $3, $4::jsonb)
+    ON CONFLICT (id)
+    DO UPDATE SET embedding=EXCLUDED.embedding, payload=EXCLUDED.payload;
+"""
+
+UPSERT_PRODUCT_SQL = """
+    INSERT INTO products (id, product_id, name_emb, cat_emb, kw_emb, name, category, additional_info)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8::jsonb)
+    ON CONFLICT (id)
+    DO UPDATE SET name_emb=EXCLUDED.name_emb,
+                  cat_emb=EXCLUDED.cat_emb,
+                  kw_emb=EXCLUDED.kw_emb;
+"""
+
+
 async def upsert_profile(pool: asyncpg.Pool, profile: Dict):
-    vec = await build_profile_vector(
-        profile["page_view_keywords"],
-        profile["purchase_keywords"],
-        profile["interest_keywords"],
-    )
+    await batch_upsert_profiles(pool, [profile])
 
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO profiles (id, profile_id, embedding, payload)
-            VALUES ($1, $2, $3::vector, $4::jsonb)
-            ON CONFLICT (id)
-            DO UPDATE SET embedding=EXCLUDED.embedding, payload=EXCLUDED.payload;
-            """,
-            string_to_point_id(profile["profile_id"]),
-            profile["profile_id"],
-            vec_to_pg(vec),
-            json.dumps(profile),
-        )
 
+async def batch_upsert_profiles(
+    pool: asyncpg.Pool,
+    profiles: Sequence[Dict],
+    vectors: Optional[Sequence[Optional[np.ndarray]]] = None,
+):
+    """
+    Profile vectors (unless precomputed, e.g. by bulk_build) computed with bounded
+    concurrency, then the whole batch goes through one prepared statement on a
+    single connection.
+    """
+    if vectors is None:
+        vectors = await gather_bounded([
+            build_profile_vector(
+                p["page_view_keywords"],
+                p["purchase_keywords"],
+                p["interest_keywords"],
+            )
+            for p in profiles
+        ])
 
-async def batch_upsert_products(pool: asyncpg.Pool, products: Sequence[Dict]):
-    tasks = [
-        build_product_vector(p["name"], p["category"], p["keywords"])
-        for p in products
+    rows = [
+        (
+            string_to_point_id(p["profile_id"]),
+            p["profile_id"],
+            vec_param(v),
+            orjson.dumps(p),
+        )
+        for p, v in zip(profiles, vectors)
     ]
-    vectors = await asyncio.gather(*tasks)
+
+    async with pool.acquire() as conn:
+        stmt = await conn.prepare(UPSERT_PROFILE_SQL)
+        await stmt.executemany(rows)
+
+
+async def batch_upsert_products(
+    pool: asyncpg.Pool,
+    products: Sequence[Dict],
+    vectors: Optional[Sequence[np.ndarray]] = None,
+):
+    if vectors is None:
+        vectors = await gather_bounded([
+            build_product_vector(p["name"], p["category"], p["keywords"])
+            for p in products
+        ])
 
     rows = [
         (
             string_to_point_id(p["product_id"]),
             p["product_id"],
-            vec_to_pg(v),
+            vec_param(name_v),
+            vec_param(cat_v),
+            vec_param(kw_v),
             p["name"],
             p["category"],
-            json.dumps(p),
+            orjson.dumps(p),
         )
-        for p, v in zip(products, vectors)
+        for p, (name_v, cat_v, kw_v) in zip(products, vectors)
     ]
 
     async with pool.acquire() as conn:
-        await conn.executemany(
-            """
-            INSERT INTO products (id, product_id, embedding, name, category, additional_info)
-            VALUES ($1, $2, $3::vector, $4, $5, $6::jsonb)
-            ON CONFLICT (id)
-            DO UPDATE SET embedding=EXCLUDED.embedding;
-            """,
-            rows,
-        )
+        stmt = await conn.prepare(UPSERT_PRODUCT_SQL)
+        await stmt.executemany(rows)
 
 # ============================================================
 # Recommendation Query
 # ============================================================
 
+# A weighted sum cannot drive an index scan, so each segment's HNSW index
+# nominates candidates and only their union is rescored exactly.
+RECOMMEND_CANDIDATE_FACTOR = 8
+
+_SEGMENT_CANDIDATES = "\n        UNION\n        ".join(
+    f"(SELECT id FROM products ORDER BY {col} <=> $1 LIMIT $3)"
+    for col in PRODUCT_SEGMENTS
+)
+
+# Zero segments (e.g. no keywords) give a NaN cosine and missing ones NULL → both count as 0
+_SEGMENT_SCORE = " + ".join(
+    f"{w} * COALESCE(NULLIF(1 - (p.{col} <=> $1), 'NaN'), 0)"
+    for col, w in zip(PRODUCT_SEGMENTS, PRODUCT_SEGMENT_WEIGHTS)
+)
+
+RECOMMEND_SQL = f"""
+    WITH candidates AS (
+        {_SEGMENT_CANDIDATES}
+    )
+    SELECT * FROM (
+        SELECT p.product_id, p.name, p.category,
+               {_SEGMENT_SCORE} AS score
+        FROM products p
+        JOIN candidates c ON c.id = p.id
+    ) scored
+    ORDER BY score DESC
+    LIMIT $2;
+"""
+
+
 async def recommend_products(pool: asyncpg.Pool, profile_id: str, limit: int = 5):
     pid = string_to_point_id(profile_id)
 
@@ -247,20 +657,19 @@ async def recommend_products(pool: asyncpg.Pool, profile_id: str, limit: int = 5
             "SELECT embedding FROM profiles WHERE id=$1", pid
         )
 
+        # Only the VECTOR_DIM profile vector is sent; the per-segment cosine
+        # similarities are weighted server-side instead of matching a 3x concat.
         profile_vec = pgvector_to_numpy(rec["embedding"])
-        query_vec = normalize(np.concatenate([profile_vec] * 3))
-
-        rows = await conn.fetch(
-            """
-            SELECT product_id, name, category,
-                   1 - (embedding <=> $1::vector) AS score
-            FROM products
-            ORDER BY embedding <=> $1::vector
-            LIMIT $2;
-            """,
-            vec_to_pg(query_vec),
-            limit,
-        )
+
+        async with conn.transaction():
+            # Recall/latency knob for the HNSW scan, scoped to this query
+            await conn.execute(f"SET LOCAL hnsw.ef_search = {HNSW_EF_SEARCH};")
+            rows = await conn.fetch(
+                RECOMMEND_SQL,
+                vec_param(profile_vec),
+                limit,
+                max(limit * RECOMMEND_CANDIDATE_FACTOR, HNSW_EF_SEARCH),
+            )
 
         return [dict(r) for r in rows]
 
@@ -319,15 +728,26 @@ SAMPLE_PRODUCTS = [
 # ============================================================
 
 async def main():
-    pool = await asyncpg.create_pool(DB_DSN, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE)
+    pool = await asyncpg.create_pool(
+        DB_DSN,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        init=init_connection,
+    )
 
     try:
         await ensure_schema(pool)
 
-        for p in SAMPLE_PROFILES:
-            await upsert_profile(pool, p)
+        # One encoder super-batch for the whole seed set
+        profile_vectors, product_vectors = await bulk_build(SAMPLE_PROFILES, SAMPLE_PRODUCTS)
+
+        await batch_upsert_profiles(pool, SAMPLE_PROFILES, profile_vectors)
+
+        await batch_upsert_products(pool, SAMPLE_PRODUCTS, product_vectors)
 
-        await batch_upsert_products(pool, SAMPLE_PRODUCTS)
+        # Refresh planner stats once after the bulk load so the HNSW index is picked up
+        async with pool.acquire() as conn:
+            await conn.execute("ANALYZE products;")
 
         # Run recommendations for 3 profiles
         for pid in ["u_runner", "u_yogi", "u_gamer"]:
@@ -0,0 +1,188 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agentic_models.semantic_cache import SemanticCache
+from agentic_tools.weather_tools import WEATHER_CACHE_TTL
+
+
+# ============================================================
+# Shared test utilities
+# ============================================================
+class FakeRedis:
+    """Minimal in-memory subset of the redis-py API used by SemanticCache."""
+
+    def __init__(self):
+        self.kv = {}
+        self.ttls = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.hgetall_calls = 0
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def mget(self, keys):
+        return [self.kv.get(k) for k in keys]
+
+    def incr(self, key):
+        value = int(self.kv.get(key, 0)) + 1
+        self.kv[key] = str(value).encode("utf-8")
+        return value
+
+    def setex(self, key, ttl, value):
+        self.ttls[key] = ttl
+        self.kv[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def hgetall(self, key):
+        self.hgetall_calls += 1
+        return {k.encode("utf-8"): v for k, v in self.hashes.get(key, {}).items()}
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def _zsorted(self, key):
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+
+    def zrangebyscore(self, key, low, high):
+        low = float(low)
+        return [m for m, score in self._zsorted(key) if low <= score <= high]
+
+    def zrange(self, key, start, end):
+        return [m for m, _ in self._zsorted(key)][start:end + 1]
+
+    def expire(self, key, ttl):
+        return True
+
+
+def fake_embedder(text):
+    # "weather" prompts cluster together, everything else points elsewhere
+    if "weather" in text:
+        return np.array([1.0, 0.05, 0.0], dtype=np.float32)
+    return np.array([0.0, 0.0, 1.0], dtype=np.float32)
+
+
+def make_response(*tool_names):
+    return {
+        "answer": "It is sunny.",
+        "debug": {
+            "calls": [{"name": n, "arguments": {}} for n in tool_names],
+            "data": [{"name": n, "response": "{}"} for n in tool_names],
+        },
+    }
+
+
+# ============================================================
+# Tests
+# ============================================================
+def test_exact_and_semantic_hits():
+    cache = SemanticCache(redis_client=FakeRedis(), embedder=fake_embedder)
+
+    assert cache.set("What is the weather in Hanoi?", make_response("get_current_weather"))
+
+    # Exact (normalized) hit
+    assert cache.get("  what is the WEATHER in hanoi? ")["answer"] == "It is sunny."
+    # Semantic hit
+    assert cache.get("weather in Hanoi please")["answer"] == "It is sunny."
+    # Unrelated prompt misses
+    assert cache.get("Send a Zalo message to VIP users") is None
+
+
+def test_side_effect_tools_are_never_cached():
+    cache = SemanticCache(redis_client=FakeRedis(), embedder=fake_embedder)
+
+    assert not cache.set("email the VIP segment", make_response("get_current_weather", "activate_channel"))
+    assert cache.get("email the VIP segment") is None
+
+
+def test_disabled_without_redis_client(monkeypatch):
+    monkeypatch.setattr("agentic_models.semantic_cache.REDIS_URL", None)
+    cache = SemanticCache(embedder=fake_embedder)
+
+    assert not cache.enabled
+    assert cache.get("anything") is None
+    assert not cache.set("anything", make_response())
+
+
+def test_segment_listing_is_not_cached():
+    cache = SemanticCache(redis_client=FakeRedis(), embedder=fake_embedder)
+
+    # manage_cdp_segment changes what show_all_segments returns
+    assert not cache.set("show all segments", make_response("show_all_segments"))
+
+
+def test_weather_answers_expire_with_the_weather_cache():
+    redis_client = FakeRedis()
+    cache = SemanticCache(redis_client=redis_client, embedder=fake_embedder, ttl=3600)
+
+    assert cache.set("weather in Hanoi", make_response("get_current_weather"))
+    assert cache.set("any alerts?", make_response("get_alert_types"))
+
+    ttls = sorted(redis_client.ttls.values())
+    assert ttls == [WEATHER_CACHE_TTL, 3600]
+
+
+def test_semantic_lookups_reuse_the_local_matrix_until_a_write():
+    redis_client = FakeRedis()
+    cache = SemanticCache(redis_client=redis_client, embedder=fake_embedder)
+    cache.set("What is the weather in Hanoi?", make_response("get_current_weather"))
+
+    assert cache.get("weather in Hanoi please") is not None
+    assert cache.get("weather in Hanoi today") is not None
+    assert redis_client.hgetall_calls == 1
+
+    cache.set("any alerts?", make_response("get_alert_types"))
+    assert cache.get("weather in Hanoi tonight") is not None
+    assert redis_client.hgetall_calls == 2
+
+
+def test_full_cache_evicts_instead_of_skipping(monkeypatch):
+    monkeypatch.setattr("agentic_models.semantic_cache.MAX_SEMANTIC_ENTRIES", 2)
+    redis_client = FakeRedis()
+    cache = SemanticCache(redis_client=redis_client, embedder=fake_embedder)
+
+    for prompt in ("alerts one", "alerts two", "alerts three"):
+        assert cache.set(prompt, make_response("get_alert_types"))
+
+    vectors = redis_client.hashes[cache._vectors_key()]
+    assert len(vectors) == 2
+    assert cache._digest("alerts one") not in vectors
+    assert cache._digest("alerts three") in vectors
+
+
+def test_tool_less_and_failed_answers_are_not_cached():
+    cache = SemanticCache(redis_client=FakeRedis(), embedder=fake_embedder)
+
+    # No tool call: the tool intent may simply have been missed
+    assert not cache.set("weather in Hanoi", make_response())
+
+    # Gemini failure strings
+    failed = make_response("get_current_weather")
+    failed["answer"] = "An unexpected error occurred."
+    assert not cache.set("weather in Hanoi", failed)
+    failed["answer"] = "Error connecting to AI service: 503 UNAVAILABLE"
+    assert not cache.set("weather in Hanoi", failed)
+
+    # Tool reported an error
+    tool_error = make_response("get_current_weather")
+    tool_error["debug"]["data"][0]["response"] = '{"status": "error", "message": "Weather service unreachable"}'
+    assert not cache.set("weather in Hanoi", tool_error)
+
+    assert cache.get("weather in Hanoi") is None
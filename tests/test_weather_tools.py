@@ -1,5 +1,7 @@
+import asyncio
 import os
 import sys
+import orjson
 import pytest
 import requests
 
@@ -26,6 +28,21 @@ class FakeResponse:
     def json(self):
         return self._payload
 
+    @property
+    def content(self):
+        return orjson.dumps(self._payload)
+
+
+@pytest.fixture(autouse=True)
+def clear_weather_cache(monkeypatch):
+    # Isolate from the on-disk geocode cache and from other tests
+    monkeypatch.setattr(wt, "GEOCODE_CACHE", wt.GeocodeCache(path=""))
+    wt._WEATHER_CACHE.clear()
+    wt._geocode_attempt.cache_clear()
+    yield
+    wt._WEATHER_CACHE.clear()
+    wt._geocode_attempt.cache_clear()
+
 
 # ============================================================
 # Tests: normalization & canonicalization
@@ -41,6 +58,14 @@ def test_canonicalize_city_aliases():
     assert wt.canonicalize_city_name("Đà Nẵng") == "da nang"
 
 
+def test_canonicalize_city_prefix_with_qualifiers():
+    assert wt.canonicalize_city_name("Ho Chi Minh City, Vietnam") == "ho chi minh city"
+    assert wt.canonicalize_city_name("TP. HCM") == "ho chi minh city"
+    assert wt.canonicalize_city_name("Hà Nội, VN") == "hanoi"
+    # Alias followed by a non-qualifier is a different place: left as-is
+    assert wt.canonicalize_city_name("Hanoi Opera House") == "hanoi opera house"
+
+
 # ============================================================
 # Tests: geocoding behavior
 # ============================================================
@@ -81,7 +106,7 @@ def test_get_coordinates_handles_diacritics_and_ranking(monkeypatch):
 
         return FakeResponse({"results": []})
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(wt.requests, "get", fake_get)
 
     coords = wt.get_coordinates("Đà Lạt")
 
@@ -99,12 +124,41 @@ def test_get_coordinates_returns_none_when_unresolved(monkeypatch):
     def fake_get(url, params, timeout):
         return FakeResponse({"results": []})
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(wt.requests, "get", fake_get)
 
     coords = wt.get_coordinates("ThisCityDoesNotExist")
     assert coords is None
 
 
+def test_get_coordinates_reuses_attempts_across_aliases(monkeypatch):
+    calls = []
+
+    def fake_get(url, params, timeout):
+        calls.append((params["name"], params["language"]))
+        if params["name"] == "ho chi minh city":
+            return FakeResponse({
+                "results": [{
+                    "name": "Ho Chi Minh City",
+                    "latitude": 10.82,
+                    "longitude": 106.63,
+                    "country": "Vietnam",
+                    "country_code": "VN",
+                    "population": 8_000_000,
+                }]
+            })
+        return FakeResponse({"results": []})
+
+    monkeypatch.setattr(wt.requests, "get", fake_get)
+
+    first = wt.get_coordinates("Saigon")
+    second = wt.get_coordinates("HCMC")
+
+    assert first["name"] == second["name"] == "Ho Chi Minh City"
+    # The canonical-name queries were only sent for the first alias
+    assert calls.count(("ho chi minh city", "vi")) == 1
+    assert calls.count(("ho chi minh city", "en")) == 1
+
+
 # ============================================================
 # Tests: weather integration
 # ============================================================
@@ -142,7 +196,7 @@ def test_get_current_weather_success(monkeypatch):
 
         pytest.fail("Unexpected URL called")
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(wt.requests, "get", fake_get)
 
     res = wt.get_current_weather("Đà Lạt")
 
@@ -163,8 +217,116 @@ def test_get_current_weather_location_not_found(monkeypatch):
     def fake_get(url, params, timeout):
         return FakeResponse({"results": []})
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(wt.requests, "get", fake_get)
 
     res = wt.get_current_weather("Atlantis")
     assert res["status"] == "error"
     assert "Location not found" in res["message"]
+
+
+def test_get_current_weather_served_from_ttl_cache(monkeypatch):
+    calls = []
+
+    def fake_get(url, params, timeout):
+        calls.append(url)
+        if "geocoding-api" in url:
+            return FakeResponse({
+                "results": [
+                    {
+                        "name": "Hanoi",
+                        "latitude": 21.0245,
+                        "longitude": 105.8412,
+                        "country": "Vietnam",
+                        "country_code": "VN",
+                        "population": 8000000,
+                    }
+                ]
+            })
+        return FakeResponse({
+            "current_weather": {"temperature": 25.0, "windspeed": 5.0, "weathercode": 0, "is_day": 1}
+        })
+
+    monkeypatch.setattr(wt.requests, "get", fake_get)
+
+    first = wt.get_current_weather("Hanoi")
+    n_calls = len(calls)
+
+    # Alias of the same city within the TTL → no further HTTP calls
+    second = wt.get_current_weather("Ha Noi")
+    assert len(calls) == n_calls
+    assert second["weather"] == first["weather"]
+    assert second["location"]["input"] == "Ha Noi"
+
+    # Expired entry → fetched again
+    monkeypatch.setattr(wt, "WEATHER_CACHE_TTL", 0)
+    wt.get_current_weather("Hanoi")
+    assert len(calls) > n_calls
+
+
+def test_get_current_weather_bulk_preserves_input_order(monkeypatch):
+    def fake_weather(location, unit="celsius"):
+        return {"status": "success", "location": {"input": location}, "unit": unit}
+
+    monkeypatch.setattr(wt, "get_current_weather", fake_weather)
+
+    res = wt.get_current_weather_bulk(["Hanoi", "Da Nang", "Hue"], unit="fahrenheit")
+
+    assert [r["location"]["input"] for r in res] == ["Hanoi", "Da Nang", "Hue"]
+    assert all(r["unit"] == "fahrenheit" for r in res)
+    assert wt.get_current_weather_bulk([]) == []
+
+
+def test_get_current_weather_bulk_treats_a_string_as_one_location(monkeypatch):
+    calls = []
+
+    def fake_weather(location, unit="celsius"):
+        calls.append(location)
+        return {"status": "success", "location": {"input": location}}
+
+    monkeypatch.setattr(wt, "get_current_weather", fake_weather)
+
+    res = wt.get_current_weather_bulk("Hanoi")
+
+    assert calls == ["Hanoi"]
+    assert len(res) == 1
+
+
+def test_get_coordinates_served_from_geocode_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(wt, "GEOCODE_CACHE", wt.GeocodeCache(path=str(tmp_path / "geo.sqlite3")))
+    calls = []
+
+    def fake_get(url, params, timeout):
+        calls.append(params["name"])
+        return FakeResponse({
+            "results": [
+                {
+                    "name": "Hue",
+                    "latitude": 16.4637,
+                    "longitude": 107.5909,
+                    "country": "Vietnam",
+                    "country_code": "VN",
+                    "population": 450000,
+                }
+            ]
+        })
+
+    monkeypatch.setattr(wt.requests, "get", fake_get)
+
+    first = wt.get_coordinates("Huế")
+    assert calls
+
+    calls.clear()
+    # A fresh cache on the same file still hits (persists across restarts)
+    monkeypatch.setattr(wt, "GEOCODE_CACHE", wt.GeocodeCache(path=str(tmp_path / "geo.sqlite3")))
+    assert wt.get_coordinates("Hue") == first
+    assert calls == []
+
+
+def test_aget_current_weather_bulk_runs_off_loop(monkeypatch):
+    def fake_weather(location, unit="celsius"):
+        return {"status": "success", "location": {"input": location}}
+
+    monkeypatch.setattr(wt, "get_current_weather", fake_weather)
+
+    res = asyncio.run(wt.aget_current_weather_bulk(["Hanoi", "Hue"]))
+    assert [r["location"]["input"] for r in res] == ["Hanoi", "Hue"]